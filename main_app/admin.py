@@ -1,8 +1,53 @@
 from django.contrib import admin
-from .models import Document
+from .models import (
+    AnalysisCacheEntry,
+    AnalysisJob,
+    AuthorStats,
+    CacheCounter,
+    CorpusStats,
+    Document,
+    RhymeEntry,
+)
 
 @admin.register(Document)
 class DocumentAdmin(admin.ModelAdmin):
-    list_display = ("title", "author", "created_at", "word_count", "char_count")
+    list_display = ("title", "author", "created_at", "status", "word_count", "char_count")
+    list_filter = ("status", ("near_duplicate_of", admin.EmptyFieldListFilter))
     search_fields = ("title", "author")
     readonly_fields = ("formatted_text",)  # so you can *see* the HTML
+
+
+@admin.register(AnalysisJob)
+class AnalysisJobAdmin(admin.ModelAdmin):
+    list_display = ("document", "status", "attempts", "locked_by", "created_at", "finished_at")
+    list_filter = ("status",)
+    raw_id_fields = ("document",)
+
+
+@admin.register(AnalysisCacheEntry)
+class AnalysisCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ("content_hash", "analyzer_version", "hits", "created_at", "last_used_at")
+    exclude = ("result",)
+
+
+@admin.register(CacheCounter)
+class CacheCounterAdmin(admin.ModelAdmin):
+    list_display = ("name", "value")
+
+
+@admin.register(AuthorStats)
+class AuthorStatsAdmin(admin.ModelAdmin):
+    list_display = ("author", "documents", "word_count", "line_count", "syllable_count", "updated_at")
+    search_fields = ("author",)
+
+
+@admin.register(CorpusStats)
+class CorpusStatsAdmin(admin.ModelAdmin):
+    list_display = ("documents", "word_count", "line_count", "syllable_count", "updated_at")
+
+
+@admin.register(RhymeEntry)
+class RhymeEntryAdmin(admin.ModelAdmin):
+    list_display = ("word", "rhyme_key", "document", "line")
+    search_fields = ("word", "rhyme_key")
+    raw_id_fields = ("document",)
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class MainAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'main_app'
+
+    def ready(self):
+        from django.conf import settings
+        from . import signals, timing  # noqa: F401
+
+        timing.configure(getattr(settings, "TIMING_ENABLED", timing.ENABLED))
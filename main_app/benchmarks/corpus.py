@@ -0,0 +1,125 @@
+"""
+Synthetic corpus generator for the analysis benchmarks.
+
+Documents are built from a fixed list of common words that are in cmudict
+plus generated nonsense words that are not, mixed at a chosen ratio, so the
+cmudict lookup and the fallback heuristic are both exercised in known
+proportions. Formatting density is the chance each run is bold/italic/underlined.
+"""
+import random
+
+import docx
+
+from .. import syllable_index
+
+DICTIONARY_WORDS = (
+    "the and of to a in is it you that he was for on are with as his they be at one "
+    "have this from or had by word but what some we can out other were all there when "
+    "up use your how said an each she which do their time if will way about many then "
+    "them write would like so these her long make thing see him two has look more day "
+    "could go come did number sound no most people my over know water than call first "
+    "who may down side been now find river moon silver heart summer light shadow quiet "
+    "morning evening winter garden ocean mountain beautiful remember forever whisper "
+    "understand wandering golden yesterday tomorrow everything nothing"
+).split()
+
+CONSONANTS = "bcdfghjklmnpqrstvwxz"
+VOWELS = "aeiou"
+
+
+def nonsense_word(rnd: random.Random) -> str:
+    """A pronounceable word that isn't in the syllable index."""
+    while True:
+        word = "".join(
+            rnd.choice(CONSONANTS) + rnd.choice(VOWELS) for _ in range(rnd.randint(2, 4))
+        ) + rnd.choice(CONSONANTS)
+        if syllable_index.syllables(word) is None:
+            return word
+
+
+class CorpusSpec:
+    """Size and shape of a synthetic document."""
+
+    def __init__(self, paragraphs=500, words_per_line=8, runs_per_line=3,
+                 formatting_density=0.2, oov_ratio=0.1, blank_line_every=5, seed=0):
+        self.paragraphs = paragraphs
+        self.words_per_line = words_per_line
+        self.runs_per_line = runs_per_line
+        self.formatting_density = formatting_density
+        self.oov_ratio = oov_ratio
+        self.blank_line_every = blank_line_every
+        self.seed = seed
+
+    def as_dict(self) -> dict:
+        return dict(vars(self))
+
+
+def generate_lines(spec: CorpusSpec) -> list:
+    """
+    Lines as lists of runs: [(text, bold, italic, underline), ...].
+    Blank lines are empty lists.
+    """
+    rnd = random.Random(spec.seed)
+    oov_pool = [nonsense_word(rnd) for _ in range(200)]
+
+    lines = []
+    for i in range(spec.paragraphs):
+        if spec.blank_line_every and i % spec.blank_line_every == spec.blank_line_every - 1:
+            lines.append([])
+            continue
+
+        words = [
+            rnd.choice(oov_pool) if rnd.random() < spec.oov_ratio else rnd.choice(DICTIONARY_WORDS)
+            for _ in range(spec.words_per_line)
+        ]
+        words[-1] += rnd.choice([",", ".", "", "!", "?", ";"])
+
+        runs = []
+        per_run = max(1, len(words) // spec.runs_per_line)
+        for start in range(0, len(words), per_run):
+            text = " ".join(words[start:start + per_run]) + " "
+            runs.append((
+                text,
+                rnd.random() < spec.formatting_density,
+                rnd.random() < spec.formatting_density,
+                rnd.random() < spec.formatting_density / 2,
+            ))
+        lines.append(runs)
+    return lines
+
+
+def write_docx(lines, path):
+    doc = docx.Document()
+    for runs in lines:
+        para = doc.add_paragraph()
+        for text, bold, italic, underline in runs:
+            run = para.add_run(text)
+            run.bold = bold or None
+            run.italic = italic or None
+            run.underline = underline or None
+    doc.save(path)
+
+
+def to_html(lines) -> str:
+    """CKEditor-style HTML for the same lines."""
+    parts = []
+    for runs in lines:
+        if not runs:
+            parts.append("<p>&nbsp;</p>")
+            continue
+        html = ""
+        for text, bold, italic, underline in runs:
+            if bold:
+                text = f"<strong>{text}</strong>"
+            if italic:
+                text = f"<em>{text}</em>"
+            if underline:
+                text = f"<u>{text}</u>"
+            html += text
+        parts.append(f"<p>{html}</p>")
+    return "\n".join(parts)
+
+
+def tokens(lines) -> list:
+    """The whitespace-separated tokens, as the document-level counts see them."""
+    return [word for runs in lines for text, *_ in runs for word in text.split()]
@@ -0,0 +1,115 @@
+"""
+Concurrent load on the async views, driven in-process through the ASGI handler.
+
+Some clients keep uploading synthetic manuscripts (analyzed in the request,
+with the background queue off) while the rest read the pieces index and a
+detail page. Each ANALYSIS_EXECUTOR mode runs in turn against the same
+load: "inline" analyzes on the event loop like the sync views did, so it
+shows how much reads stall behind uploads without the pool.
+"""
+import asyncio
+import time
+
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+
+from .. import executor
+from ..models import Document
+from . import corpus
+from .runner import percentile
+
+
+def upload_payloads(spec: corpus.CorpusSpec, count: int) -> list:
+    """`count` distinct pasted-HTML uploads (distinct so the analysis cache never hits)."""
+    html = corpus.to_html(corpus.generate_lines(spec))
+    return [f"{html}\n<p>Upload number {i}.</p>" for i in range(count)]
+
+
+def seed_piece(spec: corpus.CorpusSpec) -> str:
+    """An analyzed piece for the readers to fetch; returns its slug."""
+    doc = Document(title="Load test", author="Benchmark", formatted_text=corpus.to_html(
+        corpus.generate_lines(spec)
+    ))
+    doc.slug = doc.generate_slug()
+    doc.analyze()
+    doc.status = Document.STATUS_DONE
+    doc.save()
+    return doc.slug
+
+
+def _summary(latencies: list, statuses: list, elapsed: float) -> dict:
+    ok = [latency for latency, status in zip(latencies, statuses) if status < 500]
+    return {
+        "requests": len(latencies),
+        "per_sec": len(ok) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(ok, 50) * 1000 if ok else 0.0,
+        "p95_ms": percentile(ok, 95) * 1000 if ok else 0.0,
+        "rejected": sum(1 for status in statuses if status == 503),
+    }
+
+
+async def _run(readers: int, uploaders: int, duration: float, payloads: list, slug: str) -> dict:
+    read_urls = [reverse("index"), reverse("document_detail", kwargs={"slug": slug})]
+    upload_url = reverse("uploader")
+    reads, uploads = ([], []), ([], [])
+    next_payload = iter(range(len(payloads)))
+    deadline = time.perf_counter() + duration
+
+    async def reader(n):
+        client = AsyncClient()
+        i = n
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.get(read_urls[i % len(read_urls)])
+            reads[0].append(time.perf_counter() - start)
+            reads[1].append(response.status_code)
+            i += 1
+
+    async def uploader(n):
+        client = AsyncClient()
+        for i in next_payload:
+            if time.perf_counter() >= deadline:
+                return
+            start = time.perf_counter()
+            response = await client.post(upload_url, {
+                "title": f"Load {n}-{i}",
+                "author": "Benchmark",
+                "formatted_text": payloads[i],
+            })
+            uploads[0].append(time.perf_counter() - start)
+            uploads[1].append(response.status_code)
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(reader(n) for n in range(readers)),
+        *(uploader(n) for n in range(uploaders)),
+    )
+    elapsed = time.perf_counter() - start
+    return {
+        "elapsed_s": elapsed,
+        "reads": _summary(*reads, elapsed),
+        "uploads": _summary(*uploads, elapsed),
+    }
+
+
+def run_modes(modes, readers: int, uploaders: int, duration: float, spec: corpus.CorpusSpec,
+              workers: int) -> dict:
+    """{mode: {"reads": {...}, "uploads": {...}, "elapsed_s": s}} for each executor mode."""
+    slug = seed_piece(spec)
+    # Enough payloads that no uploader runs out before the deadline
+    payloads = upload_payloads(spec, max(50, uploaders * 50))
+
+    results = {}
+    for mode in modes:
+        with override_settings(
+            ANALYSIS_QUEUE_ENABLED=False,
+            ANALYSIS_EXECUTOR=mode,
+            ANALYSIS_EXECUTOR_WORKERS=workers,
+        ):
+            executor.shutdown()
+            try:
+                results[mode] = asyncio.run(_run(readers, uploaders, duration, payloads, slug))
+            finally:
+                executor.shutdown()
+        Document.objects.filter(author="Benchmark").exclude(slug=slug).delete()
+    return results
@@ -0,0 +1,93 @@
+"""Timing/memory measurement for the analysis hot paths."""
+import gc
+import platform
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+from .. import utils
+from . import corpus
+
+
+def percentile(values, q: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def measure(fn, repeats: int, units: int) -> dict:
+    """
+    Latency percentiles over `repeats` calls and peak traced memory of one
+    extra call. `units` (words processed per call) gives the throughput.
+    """
+    fn()  # warm up caches and lazy loads
+    latencies = []
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    median = statistics.median(latencies)
+    return {
+        "p50_ms": median * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "words_per_sec": units / median if median else 0.0,
+        "peak_kib": peak / 1024,
+    }
+
+
+def run_suite(spec: corpus.CorpusSpec, repeats: int, workdir) -> dict:
+    """Benchmark every analysis entry point on one synthetic document."""
+    lines = corpus.generate_lines(spec)
+    docx_path = str(Path(workdir) / "benchmark.docx")
+    corpus.write_docx(lines, docx_path)
+    html = corpus.to_html(lines)
+    tokens = corpus.tokens(lines)
+    words = len(tokens)
+
+    def count_all():
+        for token in tokens:
+            utils.count_syllables_in_word(token)
+
+    cases = {
+        "process_docx": lambda: utils.process_docx(docx_path),
+        "process_docx_perline": lambda: utils.process_docx_perline(docx_path),
+        "analyze_docx": lambda: utils.analyze_docx(docx_path),
+        "process_html": lambda: utils.process_html(html),
+        "process_html_perline": lambda: utils.process_html_perline(html),
+        "analyze_html": lambda: utils.analyze_html(html),
+        "count_syllables_in_word": count_all,
+        "count_syllables": lambda: utils.count_syllables(tokens),
+    }
+    results = {name: measure(fn, repeats, words) for name, fn in cases.items()}
+    return {
+        "spec": spec.as_dict(),
+        "words": words,
+        "repeats": repeats,
+        "python": platform.python_version(),
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """(name, baseline p50, current p50, ratio) for cases slower than 1 + threshold."""
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before or not before["p50_ms"]:
+            continue
+        ratio = result["p50_ms"] / before["p50_ms"]
+        if ratio > 1 + threshold:
+            regressions.append((name, before["p50_ms"], result["p50_ms"], ratio))
+    return regressions
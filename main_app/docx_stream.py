@@ -0,0 +1,128 @@
+"""
+Streaming reader for .docx files.
+
+python-docx builds the whole document tree before anything can be read.
+This reader parses word/document.xml incrementally and yields body
+paragraphs one at a time, dropping each from the tree once it has been
+read, so memory stays flat regardless of document length.
+
+The paragraph/run values follow python-docx's semantics (direct formatting
+only, hyperlink text included in the paragraph text but not in its runs).
+"""
+from typing import Iterator, NamedTuple, Optional
+import xml.etree.ElementTree as ET
+import zipfile
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+BODY = f"{W}body"
+P = f"{W}p"
+R = f"{W}r"
+HYPERLINK = f"{W}hyperlink"
+VAL = f"{W}val"
+
+# w:jc values, numbered like python-docx's WD_PARAGRAPH_ALIGNMENT
+JC_ALIGNMENT = {
+    "left": 0,
+    "start": 0,
+    "center": 1,
+    "right": 2,
+    "end": 2,
+    "both": 3,
+    "distribute": 4,
+}
+
+# Run content elements and their text (w:br is handled separately)
+RUN_TEXT = {
+    f"{W}tab": "\t",
+    f"{W}ptab": "\t",
+    f"{W}cr": "\n",
+    f"{W}noBreakHyphen": "-",
+}
+
+
+class Run(NamedTuple):
+    text: str
+    bold: Optional[bool]
+    italic: Optional[bool]
+    underline: Optional[bool]
+
+
+class Paragraph(NamedTuple):
+    text: str
+    alignment: Optional[int]
+    runs: list
+
+
+def _on_off(rpr, tag) -> Optional[bool]:
+    """Tri-state toggle property: None if absent, else its w:val (default on)."""
+    el = rpr.find(f"{W}{tag}")
+    if el is None:
+        return None
+    return el.get(VAL, "true") not in ("0", "false", "off")
+
+
+def _run_text(r) -> str:
+    parts = []
+    for child in r:
+        tag = child.tag
+        if tag == f"{W}t":
+            parts.append(child.text or "")
+        elif tag == f"{W}br":
+            # Page and column breaks have no text equivalent
+            if child.get(f"{W}type", "textWrapping") == "textWrapping":
+                parts.append("\n")
+        elif tag in RUN_TEXT:
+            parts.append(RUN_TEXT[tag])
+    return "".join(parts)
+
+
+def _read_run(r) -> Run:
+    text = _run_text(r)
+    rpr = r.find(f"{W}rPr")
+    if rpr is None:
+        return Run(text, None, None, None)
+
+    u = rpr.find(f"{W}u")
+    underline = None if u is None else u.get(VAL) != "none"
+    return Run(text, _on_off(rpr, "b"), _on_off(rpr, "i"), underline)
+
+
+def _read_paragraph(p) -> Paragraph:
+    alignment = None
+    ppr = p.find(f"{W}pPr")
+    if ppr is not None:
+        jc = ppr.find(f"{W}jc")
+        if jc is not None:
+            alignment = JC_ALIGNMENT.get(jc.get(VAL))
+
+    runs = []
+    text_parts = []
+    for child in p:
+        if child.tag == R:
+            run = _read_run(child)
+            runs.append(run)
+            text_parts.append(run.text)
+        elif child.tag == HYPERLINK:
+            text_parts.extend(_run_text(r) for r in child.findall(R))
+
+    return Paragraph("".join(text_parts), alignment, runs)
+
+
+def iter_paragraphs(file_path) -> Iterator[Paragraph]:
+    """Yield the body paragraphs of a .docx file in document order."""
+    with zipfile.ZipFile(file_path) as zf, zf.open("word/document.xml") as xml:
+        parents = []  # tags of the open ancestors of the current element
+        body = None
+        for event, elem in ET.iterparse(xml, events=("start", "end")):
+            if event == "start":
+                parents.append(elem.tag)
+                if elem.tag == BODY:
+                    body = elem
+                continue
+
+            parents.pop()
+            if parents and parents[-1] == BODY:
+                # A complete top-level block (paragraph, table, section props)
+                if elem.tag == P:
+                    yield _read_paragraph(elem)
+                body.remove(elem)
@@ -0,0 +1,98 @@
+"""
+Bounded pool for the CPU-heavy analysis called from async views.
+
+    try:
+        with executor.slot():
+            summary = await executor.run(analyze_html, html)
+    except executor.Saturated:
+        ...  # 503 with Retry-After: executor.retry_after()
+
+slot() reserves room for one request's analysis before any work starts,
+and fails at once instead of queueing without bound. run() hands the call
+to the pool and awaits it without blocking the event loop.
+
+ANALYSIS_EXECUTOR picks the pool: "thread" (default), "process" (the
+analyzers hold the GIL, so this is the one that runs them in parallel;
+functions and arguments must pickle) or "inline" (run on the event loop,
+as the sync views did). ANALYSIS_EXECUTOR_WORKERS calls run at once and
+ANALYSIS_EXECUTOR_QUEUE more may wait for a worker.
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from . import timing
+
+KINDS = ("inline", "thread", "process")
+
+_lock = threading.Lock()
+_pool = None
+_slots = None
+
+
+class Saturated(Exception):
+    """Every analysis slot is taken; the client should retry later."""
+
+
+def retry_after() -> int:
+    """Seconds a client turned away with Saturated should wait."""
+    return getattr(settings, "ANALYSIS_EXECUTOR_RETRY_AFTER", 5)
+
+
+def _get():
+    global _pool, _slots
+    with _lock:
+        if _slots is None:
+            kind = getattr(settings, "ANALYSIS_EXECUTOR", "thread")
+            if kind not in KINDS:
+                raise ImproperlyConfigured(f"ANALYSIS_EXECUTOR must be one of {', '.join(KINDS)}.")
+            workers = max(1, getattr(settings, "ANALYSIS_EXECUTOR_WORKERS", 2))
+            queue = max(0, getattr(settings, "ANALYSIS_EXECUTOR_QUEUE", 8))
+            if kind == "thread":
+                _pool = ThreadPoolExecutor(workers, thread_name_prefix="analysis")
+            elif kind == "process":
+                _pool = ProcessPoolExecutor(workers)
+            _slots = threading.BoundedSemaphore(workers + queue)
+        return _pool, _slots
+
+
+@contextmanager
+def slot():
+    """Hold one analysis slot for the block; raises Saturated when none is free."""
+    _, slots = _get()
+    if not slots.acquire(blocking=False):
+        if timing.ENABLED:
+            timing.count("executor.saturated")
+        raise Saturated
+    try:
+        yield
+    finally:
+        slots.release()
+
+
+async def run(fn, *args):
+    """Await fn(*args) on the analysis pool."""
+    pool, _ = _get()
+    if pool is None:
+        return fn(*args)
+    if isinstance(pool, ThreadPoolExecutor):
+        # Stages timed in the worker thread still count toward this request
+        call = functools.partial(contextvars.copy_context().run, fn, *args)
+    else:
+        call = functools.partial(fn, *args)
+    return await asyncio.get_running_loop().run_in_executor(pool, call)
+
+
+def shutdown(wait: bool = True):
+    """Stop the pool; the next slot() or run() starts one from the current settings."""
+    global _pool, _slots
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=wait)
+        _pool = _slots = None
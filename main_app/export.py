@@ -0,0 +1,134 @@
+"""
+Corpus statistics export, streamed as CSV or JSON Lines.
+
+Two shapes of row:
+
+    pieces  one row per analyzed piece: its counts, readability, meter, scheme
+    lines   one row per line of every piece: words, syllables, stress, meter, rhyme
+
+Rows are produced by generators over QuerySet.iterator(), a chunk of
+EXPORT_CHUNK_SIZE pieces at a time (a server-side cursor on PostgreSQL), so
+memory stays flat however large the corpus is. Each handler needs its own
+kind of iterator to stream rather than buffer the body (see streaming.py):
+the /api/export/ view sends export() itself under WSGI and aexport(), an
+async iterator over it, under ASGI. `manage.py export_stats` writes
+export() directly.
+"""
+import csv
+import json
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Document
+from .rhyme import line_text
+from .streaming import aiterate
+
+EXPORT_CHUNK_SIZE = 200
+FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+SHAPES = ("pieces", "lines")
+
+PIECE_COLUMNS = (
+    "slug", "title", "author", "created_at",
+    "word_count", "char_count", "sentence_count", "line_count", "paragraph_count", "syllable_count",
+    "flesch_reading_ease", "syllables_per_word", "syllables_per_line",
+    "meter", "rhyme_scheme",
+)
+LINE_COLUMNS = ("slug", "line", "text", "words", "syllables", "stress", "meter", "rhyme")
+
+
+def _moment(value: str, name: str, end_of_day=False) -> datetime:
+    """A datetime from an ISO date or datetime; a bare date covers the whole day."""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid {name}: {value!r}; use YYYY-MM-DD or an ISO datetime.")
+        moment = datetime.combine(day, time.max if end_of_day else time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def export_queryset(authors=(), since=None, until=None):
+    """
+    Analyzed pieces to export, oldest first. `authors` narrows to exact
+    author names; `since`/`until` are inclusive ISO dates or datetimes on
+    the upload time. Raises ValueError for an unparseable date.
+    """
+    queryset = Document.objects.filter(status=Document.STATUS_DONE)
+    if authors:
+        queryset = queryset.filter(author__in=list(authors))
+    if since:
+        queryset = queryset.filter(created_at__gte=_moment(since, "since"))
+    if until:
+        queryset = queryset.filter(created_at__lte=_moment(until, "until", end_of_day=True))
+    return queryset.order_by("created_at", "id")
+
+
+def piece_rows(queryset):
+    """One dict per piece, in PIECE_COLUMNS order."""
+    for row in queryset.values(*PIECE_COLUMNS).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        row["created_at"] = row["created_at"].isoformat()
+        yield row
+
+
+def line_rows(queryset):
+    """One dict per (non-blank) line, in LINE_COLUMNS order; "line" as in RhymeEntry."""
+    documents = queryset.only("slug", "line_stats").iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    for document in documents:
+        for i, line in enumerate(document.line_stats or []):
+            if line.get("words", 0) == -1:
+                continue
+            yield {
+                "slug": document.slug,
+                "line": i,
+                "text": line_text(line.get("text", "")),
+                "words": line.get("words", 0),
+                "syllables": line.get("syllables", 0),
+                "stress": line.get("stress", ""),
+                "meter": line.get("meter", ""),
+                "rhyme": line.get("rhyme", ""),
+            }
+
+
+class _Echo:
+    """A file-like object whose write() hands the line back, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def encode(rows, columns, fmt):
+    """Lazily encode row dicts as CSV (with a header) or JSON Lines."""
+    if fmt == "jsonl":
+        for row in rows:
+            yield json.dumps(row, ensure_ascii=False) + "\n"
+        return
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([row[column] for column in columns])
+
+
+def export(queryset, shape="pieces", fmt="csv"):
+    """Encoded chunks of the export of `queryset` in the given shape and format."""
+    if shape == "lines":
+        return encode(line_rows(queryset), LINE_COLUMNS, fmt)
+    return encode(piece_rows(queryset), PIECE_COLUMNS, fmt)
+
+
+async def aexport(queryset, shape="pieces", fmt="csv"):
+    """
+    export() as an async iterator: EXPORT_CHUNK_SIZE rows at a time are
+    read and encoded in a thread, then sent as one chunk.
+    """
+    rows = []
+    async for row in aiterate(export(queryset, shape, fmt), EXPORT_CHUNK_SIZE):
+        rows.append(row)
+        if len(rows) >= EXPORT_CHUNK_SIZE:
+            yield "".join(rows)
+            rows = []
+    if rows:
+        yield "".join(rows)
@@ -0,0 +1,57 @@
+"""
+Model fields stored zlib-compressed in binary columns.
+
+Values are compressed on the way into the database and decompressed on
+the way out, so models, forms, views and templates keep seeing str (or
+JSON data). The database only sees bytes: these columns can't be matched
+by content (icontains, JSON key lookups), though isnull still works.
+"""
+import json
+import zlib
+
+from ckeditor.fields import RichTextField
+from django.db import models
+
+COMPRESSION_LEVEL = 6
+
+
+def compress(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def decompress(blob) -> str:
+    return zlib.decompress(bytes(blob)).decode("utf-8")
+
+
+class CompressedRichTextField(RichTextField):
+    """A RichTextField (same editor and form field) kept compressed in the database."""
+
+    def get_internal_type(self):
+        return "BinaryField"
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if not prepared:
+            value = self.get_prep_value(value)
+        if value is None:
+            return None
+        return connection.Database.Binary(compress(value))
+
+    def from_db_value(self, value, expression, connection):
+        return None if value is None else decompress(value)
+
+
+class CompressedJSONField(models.JSONField):
+    """A JSONField serialized to JSON text, then compressed."""
+
+    def get_internal_type(self):
+        return "BinaryField"
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if value is None or hasattr(value, "as_sql"):
+            return value
+        return connection.Database.Binary(compress(json.dumps(value, cls=self.encoder)))
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        return json.loads(decompress(value), cls=self.decoder)
@@ -0,0 +1,183 @@
+"""
+Syllable-density heatmaps from packed per-line metrics.
+
+Each document stores its per-line metrics in Document.line_metrics as a
+packed little-endian int16 array of shape (lines, 3):
+  words, syllables, stressed syllables   (-1, -1, -1 for blank lines)
+Heatmaps are computed with NumPy straight from those buffers, so comparing
+thousands of pieces never touches the per-line dicts.
+"""
+import numpy as np
+
+DTYPE = np.dtype("<i2")
+COLUMNS = 3
+WORDS, SYLLABLES, STRESSED = range(COLUMNS)
+STRESSED_CODES = frozenset("12M")
+# Syllables-per-line histogram bins: 0, 1, ..., MAX_BIN - 1, and MAX_BIN+
+MAX_BIN = 24
+INT16_MAX = np.iinfo(DTYPE).max
+
+
+def pack_line_metrics(line_stats) -> bytes:
+    """Pack line stats dicts into the int16 buffer stored on the document."""
+    rows = []
+    for line in line_stats or []:
+        if line.get("words", -1) == -1:
+            rows.append((-1, -1, -1))
+        else:
+            stressed = sum(1 for code in line.get("stress", "") if code in STRESSED_CODES)
+            rows.append((line["words"], line["syllables"], stressed))
+    array = np.clip(np.array(rows, dtype=np.int64).reshape(-1, COLUMNS), -1, INT16_MAX)
+    return array.astype(DTYPE).tobytes()
+
+
+def unpack_line_metrics(blob) -> np.ndarray:
+    if not blob:
+        return np.empty((0, COLUMNS), dtype=DTYPE)
+    return np.frombuffer(bytes(blob), dtype=DTYPE).reshape(-1, COLUMNS)
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    if not len(values) or window <= 1:
+        return values.astype(float)
+    # Centered window, averaged over the lines it actually covers at the edges
+    kernel = np.ones(min(window, len(values)))
+    sums = np.convolve(values, kernel, mode="same")
+    return sums / np.convolve(np.ones_like(values), kernel, mode="same")
+
+
+def _round(values):
+    return np.round(values, 3).tolist()
+
+
+def piece_heatmap(blob, window: int = 4) -> dict:
+    """
+    Per-line heatmap values for one piece. Blank lines are null so the
+    result lines up with the displayed lines.
+    """
+    metrics = unpack_line_metrics(blob)
+    content = metrics[:, WORDS] >= 0
+    syllables = metrics[content, SYLLABLES].astype(float)
+    stressed = metrics[content, STRESSED].astype(float)
+    density = np.divide(stressed, syllables, out=np.zeros_like(syllables), where=syllables > 0)
+
+    low, high = (syllables.min(), syllables.max()) if len(syllables) else (0.0, 0.0)
+    scaled = (syllables - low) / (high - low) if high > low else np.zeros_like(syllables)
+
+    def per_line(values):
+        out = [None] * len(metrics)
+        for index, value in zip(np.flatnonzero(content), _round(values)):
+            out[index] = value
+        return out
+
+    # Nearest-rank, like the corpus view
+    percentiles = (
+        np.percentile(syllables, [10, 50, 90], method="lower") if len(syllables) else [0, 0, 0]
+    )
+    return {
+        "lines": len(metrics),
+        "syllables": per_line(syllables),
+        "stress_density": per_line(density),
+        "rolling_syllables": per_line(_rolling_mean(syllables, window)),
+        "intensity": per_line(scaled),
+        "percentiles": dict(zip(("p10", "p50", "p90"), _round(percentiles))),
+        "mean_syllables": round(float(syllables.mean()), 3) if len(syllables) else 0.0,
+        "mean_stress_density": round(float(density.mean()), 3) if len(density) else 0.0,
+    }
+
+
+def _group_percentiles(values, groups, counts, qs):
+    """Nearest-rank percentiles of `values` within each group, without a Python loop per group."""
+    if values.size == 0:
+        # No content lines in any piece (all blank)
+        return {f"p{q}": np.zeros(len(counts)) for q in qs}
+    order = np.lexsort((values, groups))
+    sorted_values = values[order]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    result = {}
+    for q in qs:
+        offsets = np.floor(q / 100 * np.maximum(counts - 1, 0)).astype(np.int64)
+        picked = sorted_values[np.minimum(starts + offsets, max(len(sorted_values) - 1, 0))]
+        result[f"p{q}"] = np.where(counts > 0, picked, 0.0)
+    return result
+
+
+def corpus_heatmap(rows) -> dict:
+    """
+    Compare many pieces. `rows` is a list of (slug, title, author, line_metrics blob).
+
+    For each piece: mean syllables per line, p10/p50/p90, mean stress
+    density, and a z-score of its mean against the other pieces by the same
+    author. Plus a pieces x syllables-per-line histogram (row-normalized),
+    which is the heatmap matrix itself.
+    """
+    arrays = [unpack_line_metrics(blob) for *_, blob in rows]
+    if not arrays:
+        return {"pieces": [], "bins": list(range(MAX_BIN + 1)), "matrix": []}
+
+    sizes = np.array([len(a) for a in arrays])
+    metrics = np.concatenate(arrays) if sizes.sum() else np.empty((0, COLUMNS), dtype=DTYPE)
+    piece_of_line = np.repeat(np.arange(len(arrays)), sizes)
+
+    content = metrics[:, WORDS] >= 0
+    piece = piece_of_line[content]
+    syllables = metrics[content, SYLLABLES].astype(float)
+    stressed = metrics[content, STRESSED].astype(float)
+
+    n = len(arrays)
+    counts = np.bincount(piece, minlength=n)
+    safe_counts = np.maximum(counts, 1)
+    mean_syllables = np.bincount(piece, weights=syllables, minlength=n) / safe_counts
+    density = np.divide(stressed, syllables, out=np.zeros_like(syllables), where=syllables > 0)
+    mean_density = np.bincount(piece, weights=density, minlength=n) / safe_counts
+    percentiles = _group_percentiles(syllables, piece, counts, (10, 50, 90))
+
+    # Normalize each piece's mean against its author's pieces
+    authors, author_of_piece = np.unique([row[2] for row in rows], return_inverse=True)
+    has_lines = counts > 0
+    author_n = np.bincount(author_of_piece, weights=has_lines, minlength=len(authors))
+    author_mean = np.bincount(
+        author_of_piece, weights=mean_syllables * has_lines, minlength=len(authors)
+    ) / np.maximum(author_n, 1)
+    deviation = (mean_syllables - author_mean[author_of_piece]) * has_lines
+    author_std = np.sqrt(
+        np.bincount(author_of_piece, weights=deviation ** 2, minlength=len(authors))
+        / np.maximum(author_n, 1)
+    )
+    zscores = np.divide(
+        deviation,
+        author_std[author_of_piece],
+        out=np.zeros_like(deviation),
+        where=author_std[author_of_piece] > 0,
+    )
+
+    # Histogram of syllables per line, one row per piece
+    bins = np.minimum(syllables.astype(np.int64), MAX_BIN)
+    matrix = np.bincount(piece * (MAX_BIN + 1) + bins, minlength=n * (MAX_BIN + 1))
+    matrix = matrix.reshape(n, MAX_BIN + 1) / safe_counts[:, None]
+
+    pieces = [
+        {
+            "slug": slug,
+            "title": title,
+            "author": author,
+            "lines": int(count),
+            "mean_syllables": mean,
+            "p10": p10,
+            "p50": p50,
+            "p90": p90,
+            "mean_stress_density": dens,
+            "author_zscore": z,
+        }
+        for (slug, title, author, _), count, mean, p10, p50, p90, dens, z in zip(
+            rows,
+            counts,
+            _round(mean_syllables),
+            _round(percentiles["p10"]),
+            _round(percentiles["p50"]),
+            _round(percentiles["p90"]),
+            _round(mean_density),
+            _round(zscores),
+        )
+    ]
+    return {"pieces": pieces, "bins": list(range(MAX_BIN + 1)), "matrix": _round(matrix)}
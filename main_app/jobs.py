@@ -0,0 +1,123 @@
+"""
+DB-backed analysis queue. Jobs live in the AnalysisJob table, so the queue
+works on the existing Postgres/SQLite database without an external broker.
+
+A job is claimed with a conditional UPDATE (status QUEUED -> RUNNING), which
+only one worker can win. Jobs whose worker died are found by their expired
+lease and put back in the queue until they run out of attempts.
+"""
+import os
+import socket
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import AnalysisJob, Document
+
+
+def queue_enabled() -> bool:
+    return getattr(settings, "ANALYSIS_QUEUE_ENABLED", True)
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_analysis(doc: Document) -> AnalysisJob:
+    """Mark the document pending and queue a job to analyze it."""
+    doc.status = Document.STATUS_PENDING
+    doc.analysis_error = ""
+    doc.save(update_fields=["status", "analysis_error"])
+    return AnalysisJob.objects.create(
+        document=doc,
+        max_attempts=getattr(settings, "ANALYSIS_JOB_MAX_ATTEMPTS", 3),
+    )
+
+
+def claim_next_job(worker: str):
+    """Atomically take the oldest runnable job, or return None."""
+    now = timezone.now()
+    candidates = (
+        AnalysisJob.objects.filter(status=AnalysisJob.QUEUED, run_after__lte=now)
+        .order_by("run_after", "id")
+        .values_list("pk", flat=True)[:10]
+    )
+    for pk in candidates:
+        claimed = AnalysisJob.objects.filter(pk=pk, status=AnalysisJob.QUEUED).update(
+            status=AnalysisJob.RUNNING,
+            locked_by=worker,
+            locked_at=now,
+            attempts=F("attempts") + 1,
+        )
+        if claimed:
+            return AnalysisJob.objects.select_related("document").get(pk=pk)
+    return None
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(300, 5 * 2 ** attempts))
+
+
+def run_job(job: AnalysisJob) -> bool:
+    """Analyze the job's document. Returns True on success."""
+    doc = job.document
+    doc.status = Document.STATUS_PROCESSING
+    doc.save(update_fields=["status"])
+
+    try:
+        doc.analyze()
+    except Exception as e:
+        error = f"{e}\n{traceback.format_exc()}"
+        final = job.attempts >= job.max_attempts
+        job.status = AnalysisJob.FAILED if final else AnalysisJob.QUEUED
+        job.last_error = error
+        job.locked_by = ""
+        job.locked_at = None
+        job.run_after = timezone.now() + _retry_delay(job.attempts)
+        if final:
+            job.finished_at = timezone.now()
+        job.save()
+
+        doc.status = Document.STATUS_FAILED if final else Document.STATUS_PENDING
+        doc.analysis_error = str(e)
+        doc.save(update_fields=["status", "analysis_error"])
+        return False
+
+    doc.status = Document.STATUS_DONE
+    doc.analysis_error = ""
+    doc.save()
+
+    job.status = AnalysisJob.DONE
+    job.last_error = ""
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "last_error", "finished_at"])
+    return True
+
+
+def requeue_stale_jobs(lease_seconds: int) -> int:
+    """Return jobs held by crashed workers to the queue (or fail them)."""
+    cutoff = timezone.now() - timedelta(seconds=lease_seconds)
+    stale = AnalysisJob.objects.filter(status=AnalysisJob.RUNNING, locked_at__lt=cutoff)
+
+    requeued = stale.filter(attempts__lt=F("max_attempts")).update(
+        status=AnalysisJob.QUEUED,
+        locked_by="",
+        locked_at=None,
+        last_error="Worker stopped before finishing; requeued.",
+    )
+
+    exhausted = list(stale.values_list("pk", "document_id"))
+    if exhausted:
+        AnalysisJob.objects.filter(pk__in=[pk for pk, _ in exhausted]).update(
+            status=AnalysisJob.FAILED,
+            finished_at=timezone.now(),
+            last_error="Worker stopped before finishing; out of attempts.",
+        )
+        Document.objects.filter(pk__in=[doc_id for _, doc_id in exhausted]).update(
+            status=Document.STATUS_FAILED,
+            analysis_error="Analysis did not finish.",
+        )
+    return requeued
@@ -0,0 +1,69 @@
+"""
+Filters and sort orders for the pieces listing.
+
+    ?sort=-words                 most words first (default: newest)
+    ?lines=14                    exactly 14 lines (sonnet length)
+    ?words_min=100&words_max=500 an inclusive range
+
+Every metric has an index on (column, id) (see Document.Meta): it serves a
+range filter on that metric and a keyset-paged scan sorted by it. Filters
+on other metrics are checked on the rows that scan reads.
+tests/test_query_plans.py runs EXPLAIN on each combination.
+"""
+from django.core.exceptions import ValidationError
+
+from .models import Document
+
+# Query-string name -> Document column
+METRICS = {
+    "words": "word_count",
+    "lines": "line_count",
+    "syllables": "syllable_count",
+    "syllables_per_line": "syllables_per_line",
+    "syllables_per_word": "syllables_per_word",
+    "flesch": "flesch_reading_ease",
+}
+METRIC_INDEXES = {
+    "word_count": "document_words_id",
+    "line_count": "document_lines_id",
+    "syllable_count": "document_syllables_id",
+    "syllables_per_line": "document_syl_line_id",
+    "syllables_per_word": "document_syl_word_id",
+    "flesch_reading_ease": "document_flesch_id",
+}
+
+SORTS = {
+    "newest": "-created_at",
+    "oldest": "created_at",
+    **{name: column for name, column in METRICS.items()},
+    **{f"-{name}": f"-{column}" for name, column in METRICS.items()},
+}
+DEFAULT_SORT = "newest"
+
+# Parameters that are part of the listing query (kept in next-page links)
+PARAMS = ("sort", *METRICS, *(f"{name}_min" for name in METRICS), *(f"{name}_max" for name in METRICS))
+
+
+def _value(column, name, raw):
+    try:
+        return Document._meta.get_field(column).to_python(raw)
+    except ValidationError as e:
+        raise ValueError(f"Invalid value for {name}: {raw!r}") from e
+
+
+def listing_query(params) -> tuple[dict, str]:
+    """
+    (filter kwargs, order_by column) for the listing parameters in `params`
+    (a QueryDict or dict). Raises ValueError for unknown sorts or bad values.
+    """
+    sort = params.get("sort") or DEFAULT_SORT
+    if sort not in SORTS:
+        raise ValueError(f"Unknown sort {sort!r}; use one of {', '.join(SORTS)}.")
+
+    filters = {}
+    for name, column in METRICS.items():
+        for suffix, lookup in (("", "exact"), ("_min", "gte"), ("_max", "lte")):
+            raw = params.get(name + suffix)
+            if raw not in (None, ""):
+                filters[f"{column}__{lookup}"] = _value(column, name + suffix, raw)
+    return filters, SORTS[sort]
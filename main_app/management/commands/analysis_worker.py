@@ -0,0 +1,123 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from main_app import jobs
+from main_app.models import AnalysisCacheEntry, CacheCounter
+import multiprocessing
+import signal
+import time
+
+
+class Command(BaseCommand):
+    help = "Run queued document analysis jobs in the background."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=getattr(settings, "ANALYSIS_WORKER_CONCURRENCY", 1),
+            help="Number of worker processes (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep when the queue is empty (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--lease",
+            type=int,
+            default=getattr(settings, "ANALYSIS_JOB_LEASE_SECONDS", 600),
+            help="Seconds before a running job is considered crashed and retried.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the queue is empty instead of polling forever.",
+        )
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options["concurrency"])
+        if concurrency == 1:
+            processed = work(options)
+            self.stdout.write(self.style.SUCCESS(f"Processed {processed} jobs."))
+            return
+
+        # Children get their own DB connections after the fork
+        connections.close_all()
+        signal.signal(signal.SIGTERM, _interrupt)
+        ctx = multiprocessing.get_context("fork")
+        workers = {}
+
+        def start(slot):
+            proc = ctx.Process(target=work, args=(options,), daemon=True)
+            proc.start()
+            workers[slot] = proc
+
+        for slot in range(concurrency):
+            start(slot)
+        self.stdout.write(f"Started {concurrency} analysis workers.")
+
+        try:
+            while workers:
+                time.sleep(1)
+                for slot, proc in list(workers.items()):
+                    if proc.is_alive():
+                        continue
+                    if options["once"]:
+                        del workers[slot]
+                    else:
+                        # A crashed worker's job is requeued once its lease expires
+                        self.stderr.write(f"Worker {proc.pid} exited ({proc.exitcode}); restarting.")
+                        start(slot)
+        except KeyboardInterrupt:
+            for proc in workers.values():
+                proc.terminate()
+        for proc in workers.values():
+            proc.join()
+        self.stdout.write(self.style.SUCCESS("Analysis workers stopped."))
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def work(options) -> int:
+    """Claim and run jobs until stopped (or the queue drains with --once)."""
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+
+    worker = jobs.worker_id()
+    processed = 0
+    busy = False
+    while not stopping:
+        jobs.requeue_stale_jobs(options["lease"])
+        job = jobs.claim_next_job(worker)
+        if job is None:
+            if busy:
+                # Caught up: trim the analysis cache and write the held counts
+                tidy_up()
+                busy = False
+            if options["once"]:
+                break
+            time.sleep(options["poll_interval"])
+            continue
+        jobs.run_job(job)
+        processed += 1
+        busy = True
+    if busy:
+        tidy_up()
+    return processed
+
+
+def tidy_up():
+    AnalysisCacheEntry.evict()
+    CacheCounter.flush()
+
+
+## python manage.py analysis_worker [--concurrency N] [--once] to run
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from main_app.models import Document
+
+
+class Command(BaseCommand):
+    help = "Compute and store per-line stats for documents that don't have them yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute line stats for every document, not just missing ones "
+            "(e.g. after an analyzer upgrade added scansion or rhyme keys).",
+        )
+
+    def handle(self, *args, **options):
+        docs = Document.objects.all()
+        if not options["all"]:
+            docs = docs.filter(line_stats__isnull=True)
+
+        updated = 0
+        failed = 0
+        for doc in docs.iterator():
+            if not (doc.uploaded_file or doc.formatted_text):
+                continue
+            try:
+                doc.refresh_line_stats()
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"{doc.slug}: {e}")
+                continue
+            doc.save(update_fields=["line_stats", "line_metrics", "minhash", "meter", "rhyme_scheme"])
+            updated += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Stored line stats for {updated} documents ({failed} failed).")
+        )
+
+
+## python manage.py backfill_line_stats [--all] to run
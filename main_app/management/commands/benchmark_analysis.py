@@ -0,0 +1,109 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from main_app.benchmarks import corpus, runner
+from pathlib import Path
+import json
+import tempfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the text-analysis functions on a synthetic corpus and "
+        "optionally save or compare against a baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--paragraphs", type=int, default=500)
+        parser.add_argument("--words-per-line", type=int, default=8)
+        parser.add_argument("--runs-per-line", type=int, default=3)
+        parser.add_argument(
+            "--formatting-density",
+            type=float,
+            default=0.2,
+            help="Chance each run is bold/italic (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--oov-ratio",
+            type=float,
+            default=0.1,
+            help="Share of words not in cmudict (default: %(default)s).",
+        )
+        parser.add_argument("--repeats", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--baseline",
+            default=str(settings.BASE_DIR / "benchmarks" / "analysis_baseline.json"),
+            help="Baseline file to compare against / save to (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--save-baseline",
+            action="store_true",
+            help="Write these results as the new baseline.",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.15,
+            help="Slowdown (fraction of baseline p50) reported as a regression.",
+        )
+        parser.add_argument(
+            "--fail-on-regression",
+            action="store_true",
+            help="Exit with an error when a regression is found.",
+        )
+
+    def handle(self, *args, **options):
+        spec = corpus.CorpusSpec(
+            paragraphs=options["paragraphs"],
+            words_per_line=options["words_per_line"],
+            runs_per_line=options["runs_per_line"],
+            formatting_density=options["formatting_density"],
+            oov_ratio=options["oov_ratio"],
+            seed=options["seed"],
+        )
+        with tempfile.TemporaryDirectory() as workdir:
+            report = runner.run_suite(spec, options["repeats"], workdir)
+
+        self.stdout.write(
+            f"{report['words']} words, {spec.paragraphs} lines, {options['repeats']} repeats\n"
+        )
+        self.stdout.write(
+            f"{'function':<26}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+            f"{'words/s':>12}{'peak KiB':>11}"
+        )
+        for name, r in report["results"].items():
+            self.stdout.write(
+                f"{name:<26}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}"
+                f"{r['words_per_sec']:>12.0f}{r['peak_kib']:>11.0f}"
+            )
+
+        baseline_path = options["baseline"]
+        if options["save_baseline"]:
+            Path(baseline_path).parent.mkdir(parents=True, exist_ok=True)
+            with open(baseline_path, "w") as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Saved baseline to {baseline_path}."))
+            return
+
+        try:
+            with open(baseline_path) as f:
+                baseline = json.load(f)
+        except FileNotFoundError:
+            self.stdout.write(f"No baseline at {baseline_path}; run with --save-baseline.")
+            return
+
+        if baseline.get("spec") != report["spec"]:
+            self.stdout.write(self.style.WARNING("Baseline was recorded with a different corpus spec."))
+
+        regressions = runner.compare(report, baseline, options["threshold"])
+        for name, before, after, ratio in regressions:
+            self.stdout.write(
+                self.style.ERROR(f"REGRESSION {name}: {before:.1f} ms -> {after:.1f} ms ({ratio:.2f}x)")
+            )
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
+        elif options["fail_on_regression"]:
+            raise CommandError(f"{len(regressions)} benchmark regressions.")
+
+
+## python manage.py benchmark_analysis [--paragraphs N] [--save-baseline] to run
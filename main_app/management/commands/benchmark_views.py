@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from main_app import executor
+from main_app.benchmarks import corpus, load
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the async views in-process: concurrent uploads and page reads "
+        "for each analysis executor mode. Runs against a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--modes",
+            default="inline,thread,process",
+            help="Comma-separated ANALYSIS_EXECUTOR modes to compare (default: %(default)s).",
+        )
+        parser.add_argument("--readers", type=int, default=20)
+        parser.add_argument("--uploaders", type=int, default=4)
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=10.0,
+            help="Seconds of load per mode (default: %(default)s).",
+        )
+        parser.add_argument("--workers", type=int, default=2, help="Executor workers (default: %(default)s).")
+        parser.add_argument(
+            "--paragraphs",
+            type=int,
+            default=300,
+            help="Lines per uploaded manuscript (default: %(default)s).",
+        )
+
+    def handle(self, *args, **options):
+        modes = [mode.strip() for mode in options["modes"].split(",") if mode.strip()]
+        unknown = [mode for mode in modes if mode not in executor.KINDS]
+        if unknown:
+            raise CommandError(f"Unknown modes: {', '.join(unknown)}.")
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            results = load.run_modes(
+                modes,
+                readers=options["readers"],
+                uploaders=options["uploaders"],
+                duration=options["duration"],
+                spec=corpus.CorpusSpec(paragraphs=options["paragraphs"]),
+                workers=options["workers"],
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write(
+            f"{options['readers']} readers, {options['uploaders']} uploaders, "
+            f"{options['paragraphs']}-line uploads, {options['duration']:.0f}s per mode\n"
+        )
+        self.stdout.write(
+            f"{'mode':<10}{'reads/s':>10}{'read p50':>10}{'read p95':>10}"
+            f"{'uploads/s':>11}{'upl p50':>10}{'upl p95':>10}{'503s':>7}"
+        )
+        for mode, r in results.items():
+            reads, uploads = r["reads"], r["uploads"]
+            self.stdout.write(
+                f"{mode:<10}{reads['per_sec']:>10.1f}{reads['p50_ms']:>10.1f}{reads['p95_ms']:>10.1f}"
+                f"{uploads['per_sec']:>11.2f}{uploads['p50_ms']:>10.1f}{uploads['p95_ms']:>10.1f}"
+                f"{uploads['rejected']:>7}"
+            )
+
+
+## python manage.py benchmark_views [--modes inline,thread,process] [--duration S] to run
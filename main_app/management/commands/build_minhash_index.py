@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from main_app import minhash
+from main_app.models import Document, MinHashBucket
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = (
+        "Compute MinHash signatures from the stored line stats, rebuild the LSH "
+        "buckets and flag pieces that are near-duplicates of earlier ones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute every signature, not just missing ones (e.g. after changing the shingling).",
+        )
+
+    def handle(self, *args, **options):
+        docs = Document.objects.filter(line_stats__isnull=False)
+        if not options["all"]:
+            docs = docs.filter(minhash__isnull=True)
+
+        signed = 0
+        batch = []
+        for doc in docs.only("pk", "line_stats").order_by("pk").iterator(chunk_size=BATCH_SIZE):
+            doc.minhash = minhash.signature(doc.line_stats)
+            batch.append(doc)
+            if len(batch) >= BATCH_SIZE:
+                signed += self.write_batch(batch)
+                batch = []
+        if batch:
+            signed += self.write_batch(batch)
+
+        # Flags depend on every earlier piece being indexed, so they come last
+        flagged = 0
+        flags = Document.objects.only("pk", "minhash", "near_duplicate_of", "near_duplicate_similarity")
+        for doc in flags.order_by("pk").iterator(chunk_size=BATCH_SIZE):
+            doc.flag_near_duplicate()
+            flagged += doc.near_duplicate_of_id is not None
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Signed {signed} documents; {flagged} flagged as near-duplicates.")
+        )
+
+    def write_batch(self, docs) -> int:
+        # updated_at re-versions the cached detail pages (see Document.cache_version)
+        now = timezone.now()
+        for doc in docs:
+            doc.updated_at = now
+        Document.objects.bulk_update(docs, ["minhash", "updated_at"])
+        MinHashBucket.index_documents(docs)
+        return len(docs)
+
+
+## python manage.py build_minhash_index [--all] to run
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from main_app import syllable_index
+import time
+
+
+class Command(BaseCommand):
+    help = "Build the memory-mapped syllable/stress table from the NLTK cmudict corpus."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default=str(syllable_index.index_path()),
+            help="Where to write the index (default: %(default)s).",
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        pronouncing_dict = syllable_index.load_cmudict()
+        if not pronouncing_dict:
+            raise CommandError("cmudict not found; run nltk.download('cmudict') first.")
+
+        count = syllable_index.build_index(pronouncing_dict, options["output"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {count} words to {options['output']} in {time.perf_counter() - start:.1f}s."
+            )
+        )
+
+
+## python manage.py build_syllable_index to run
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from main_app import export
+
+
+class Command(BaseCommand):
+    help = "Stream every analyzed piece's counts (or every line's stats) as CSV or JSON Lines."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=list(export.FORMATS), default="csv")
+        parser.add_argument("--shape", choices=export.SHAPES, default="pieces")
+        parser.add_argument(
+            "--author",
+            action="append",
+            default=[],
+            help="Only this author's pieces (repeatable).",
+        )
+        parser.add_argument("--since", help="Uploaded on or after this ISO date/datetime.")
+        parser.add_argument("--until", help="Uploaded on or before this ISO date/datetime.")
+        parser.add_argument("--output", "-o", help="File to write (default: stdout).")
+
+    def handle(self, *args, **options):
+        try:
+            queryset = export.export_queryset(options["author"], options["since"], options["until"])
+        except ValueError as e:
+            raise CommandError(str(e)) from e
+
+        chunks = export.export(queryset, options["shape"], options["format"])
+        if not options["output"]:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+        with open(options["output"], "w", encoding="utf-8", newline="") as out:
+            out.writelines(chunks)
+        self.stderr.write(self.style.SUCCESS(f"Wrote {options['output']}."))
+
+
+## python manage.py export_stats [--format csv|jsonl] [--shape pieces|lines] [--author A] [--since D] [--until D] [-o FILE] to run
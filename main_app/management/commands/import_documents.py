@@ -0,0 +1,170 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+from main_app import search
+from main_app.models import AnalysisCacheEntry, CacheCounter, Document, MinHashBucket, RhymeEntry
+from main_app.utils import analyze_docx, hash_docx
+from pathlib import Path
+import os
+import time
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import a directory of .docx files. Titles come from the file names; "
+        "files named 'Title - Author.docx' also set the author."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory", help="Directory containing .docx files.")
+        parser.add_argument(
+            "--author",
+            default="Unknown",
+            help="Author for files that don't name one (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Analysis processes (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Rows per bulk_create (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--recursive",
+            action="store_true",
+            help="Also import files from subdirectories.",
+        )
+
+    def handle(self, *args, **options):
+        directory = Path(options["directory"])
+        if not directory.is_dir():
+            raise CommandError(f"{directory} is not a directory.")
+
+        pattern = "**/*.docx" if options["recursive"] else "*.docx"
+        # Skip Word's "~$" lock files
+        paths = sorted(p for p in directory.glob(pattern) if not p.name.startswith("~$"))
+        if not paths:
+            self.stdout.write("No .docx files found.")
+            return
+
+        start = time.perf_counter()
+        imported = 0
+        failures = []
+        pending = []
+
+        # Files analyzed before (same bytes) come straight from the cache
+        hashes = {}
+        for path in paths:
+            try:
+                hashes[path] = hash_docx(str(path))
+            except OSError as e:
+                failures.append((path, e))
+        cached = AnalysisCacheEntry.lookup_many(hashes.values())
+
+        to_analyze = []
+        for path, content_hash in hashes.items():
+            if content_hash in cached:
+                summary, line_stats = cached[content_hash]
+                pending.append(self.build_document(path, content_hash, summary, line_stats, options))
+            else:
+                to_analyze.append(path)
+
+        with ProcessPoolExecutor(max_workers=max(1, options["workers"])) as pool:
+            futures = {pool.submit(analyze_docx, str(path)): path for path in to_analyze}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    summary, line_stats = future.result()
+                except Exception as e:
+                    failures.append((path, e))
+                    continue
+
+                AnalysisCacheEntry.store(hashes[path], summary, line_stats)
+                pending.append(self.build_document(path, hashes[path], summary, line_stats, options))
+                if len(pending) >= options["batch_size"]:
+                    imported += self.write_batch(pending, failures)
+                    pending = []
+
+        if pending:
+            imported += self.write_batch(pending, failures)
+        # store() only trims the cache every so often
+        AnalysisCacheEntry.evict()
+        CacheCounter.flush()
+
+        elapsed = time.perf_counter() - start
+        for path, error in failures:
+            self.stderr.write(f"{path}: {error}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {imported} of {len(paths)} files in {elapsed:.1f}s "
+                f"({len(paths) / elapsed:.1f} files/sec, {len(failures)} failed)."
+            )
+        )
+
+    def build_document(self, path, content_hash, summary, line_stats, options):
+        title, sep, author = path.stem.partition(" - ")
+        doc = Document(
+            title=title.replace("_", " ").strip(),
+            author=author.strip() if sep else options["author"],
+            content_hash=content_hash,
+            status=Document.STATUS_DONE,
+        )
+        doc.apply_analysis(summary, line_stats)
+        doc.source_path = path
+        return doc
+
+    def write_batch(self, docs, failures) -> int:
+        """Copy the files into media storage, then insert the rows in one go."""
+        stored = []
+        for doc in docs:
+            try:
+                with open(doc.source_path, "rb") as f:
+                    doc.uploaded_file.save(doc.source_path.name, File(f), save=False)
+            except OSError as e:
+                failures.append((doc.source_path, e))
+                continue
+            stored.append(doc)
+
+        Document.assign_unique_slugs(stored)
+        try:
+            with transaction.atomic():
+                Document.objects.bulk_create(stored, batch_size=len(stored) or None)
+        except IntegrityError:
+            # Another upload took one of the slugs since they were assigned
+            return self.save_one_by_one(stored, failures)
+
+        # bulk_create skips the post_save signals that maintain the search, rhyme and LSH indexes
+        for doc in stored:
+            search.index_document(doc)
+        RhymeEntry.index_documents(stored)
+        MinHashBucket.index_documents(stored)
+        for doc in stored:
+            doc.flag_near_duplicate()
+        return len(stored)
+
+    def save_one_by_one(self, docs, failures) -> int:
+        """Insert the rows with save(), which picks a free slug and indexes each one."""
+        saved = 0
+        for doc in docs:
+            doc.pk = None
+            doc._state.adding = True
+            doc.slug = ""
+            try:
+                with transaction.atomic():
+                    doc.save()
+            except IntegrityError as e:
+                failures.append((doc.source_path, e))
+                # Nothing references the copied file now
+                doc.uploaded_file.delete(save=False)
+                continue
+            saved += 1
+        return saved
+
+
+## python manage.py import_documents path/to/dir [--author NAME] [--workers N] to run
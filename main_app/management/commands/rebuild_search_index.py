@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from main_app import search
+from main_app.models import Document
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for every document."
+
+    def handle(self, *args, **kwargs):
+        indexed = 0
+        docs = Document.objects.only("title", "author", "formatted_text")
+        for doc in docs.iterator(chunk_size=500):
+            search.index_document(doc)
+            indexed += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} documents."))
+
+
+## python manage.py rebuild_search_index to run
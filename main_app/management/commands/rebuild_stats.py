@@ -0,0 +1,42 @@
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.core.management.base import BaseCommand
+from main_app.models import COUNT_FIELDS, TOTAL_FIELDS, AuthorStats, CorpusStats, Document
+
+
+class Command(BaseCommand):
+    help = "Recompute the author and corpus aggregates from the documents (fixes drift)."
+
+    def handle(self, *args, **kwargs):
+        sums = {f: Sum(f) for f in COUNT_FIELDS}
+        with transaction.atomic():
+            rows = {
+                row.pop("author"): [row[f] or 0 for f in TOTAL_FIELDS]
+                for row in Document.objects.order_by()
+                .values("author")
+                .annotate(documents=Count("id"), **sums)
+            }
+            existing = {
+                stats.author: [getattr(stats, f) for f in TOTAL_FIELDS]
+                for stats in AuthorStats.objects.all()
+            }
+            drifted = sum(1 for author in rows.keys() | existing.keys() if rows.get(author) != existing.get(author))
+
+            AuthorStats.objects.all().delete()
+            AuthorStats.objects.bulk_create(
+                AuthorStats(author=author, **dict(zip(TOTAL_FIELDS, totals)))
+                for author, totals in rows.items()
+            )
+            corpus = Document.objects.aggregate(documents=Count("id"), **sums)
+            CorpusStats.objects.update_or_create(
+                pk=1, defaults={f: corpus[f] or 0 for f in TOTAL_FIELDS}
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt stats for {len(rows)} authors ({drifted} had drifted)."
+            )
+        )
+
+
+## python manage.py rebuild_stats to run
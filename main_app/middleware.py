@@ -0,0 +1,38 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from . import timing
+
+
+class ServerTimingMiddleware:
+    """Times each request's stages (see timing.py) into a Server-Timing header."""
+
+    # Async-capable, so async views aren't pushed onto a thread under ASGI
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not timing.ENABLED:
+            return self.get_response(request)
+
+        with timing.collect() as stages:
+            with timing.stage("request"):
+                response = self.get_response(request)
+        response["Server-Timing"] = timing.server_timing(stages)
+        return response
+
+    async def __acall__(self, request):
+        if not timing.ENABLED:
+            return await self.get_response(request)
+
+        with timing.collect() as stages:
+            with timing.stage("request"):
+                response = await self.get_response(request)
+        response["Server-Timing"] = timing.server_timing(stages)
+        return response
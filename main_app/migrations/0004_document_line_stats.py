@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0003_document_syllable_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='line_stats',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
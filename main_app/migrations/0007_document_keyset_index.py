@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0006_analysis_cache'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['-created_at', '-id'], name='document_created_id_desc'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:53
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+FTS_TABLE = "main_app_document_fts"
+
+
+def create_search_index(apps, schema_editor):
+    # Postgres gets a GIN index on the tsvector, SQLite an FTS5 table
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE INDEX document_search_vector_gin ON main_app_document USING gin (search_vector)"
+        )
+    elif schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            "title, author, body, tokenize='porter unicode61')"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS document_search_vector_gin")
+    elif schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0007_document_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
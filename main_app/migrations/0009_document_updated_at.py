@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0008_document_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0009_document_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='meter',
+            field=models.CharField(blank=True, default='', max_length=40),
+        ),
+    ]
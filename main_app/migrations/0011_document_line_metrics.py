@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:59
+
+import struct
+
+from django.db import migrations, models
+
+
+def pack_existing_line_stats(apps, schema_editor):
+    # Same layout as heatmap.pack_line_metrics: little-endian int16 (words, syllables, stressed)
+    Document = apps.get_model("main_app", "Document")
+    for doc in Document.objects.filter(line_stats__isnull=False).only("id", "line_stats").iterator():
+        values = []
+        for line in doc.line_stats:
+            if line.get("words", -1) == -1:
+                values += [-1, -1, -1]
+            else:
+                stressed = sum(1 for code in line.get("stress", "") if code in "12M")
+                values += [min(v, 32767) for v in (line["words"], line["syllables"], stressed)]
+        Document.objects.filter(pk=doc.pk).update(
+            line_metrics=struct.pack(f"<{len(values)}h", *values)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0010_document_meter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='line_metrics',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.RunPython(pack_existing_line_stats, migrations.RunPython.noop),
+    ]
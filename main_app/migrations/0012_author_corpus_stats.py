@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:01
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+TOTAL_FIELDS = (
+    "documents", "word_count", "char_count", "sentence_count",
+    "line_count", "paragraph_count", "syllable_count",
+)
+
+
+def fill_stats(apps, schema_editor):
+    # Same sums as `manage.py rebuild_stats`
+    Document = apps.get_model("main_app", "Document")
+    AuthorStats = apps.get_model("main_app", "AuthorStats")
+    CorpusStats = apps.get_model("main_app", "CorpusStats")
+    sums = {f: Sum(f) for f in TOTAL_FIELDS[1:]}
+
+    rows = Document.objects.order_by().values("author").annotate(documents=Count("id"), **sums)
+    AuthorStats.objects.bulk_create(
+        AuthorStats(author=row["author"], **{f: row[f] or 0 for f in TOTAL_FIELDS}) for row in rows
+    )
+    corpus = Document.objects.aggregate(documents=Count("id"), **sums)
+    CorpusStats.objects.create(pk=1, **{f: corpus[f] or 0 for f in TOTAL_FIELDS})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0011_document_line_metrics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('documents', models.BigIntegerField(default=0)),
+                ('word_count', models.BigIntegerField(default=0)),
+                ('char_count', models.BigIntegerField(default=0)),
+                ('sentence_count', models.BigIntegerField(default=0)),
+                ('line_count', models.BigIntegerField(default=0)),
+                ('paragraph_count', models.BigIntegerField(default=0)),
+                ('syllable_count', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('author', models.CharField(max_length=255, unique=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='CorpusStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('documents', models.BigIntegerField(default=0)),
+                ('word_count', models.BigIntegerField(default=0)),
+                ('char_count', models.BigIntegerField(default=0)),
+                ('sentence_count', models.BigIntegerField(default=0)),
+                ('line_count', models.BigIntegerField(default=0)),
+                ('paragraph_count', models.BigIntegerField(default=0)),
+                ('syllable_count', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0012_author_corpus_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='rhyme_scheme',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.CreateModel(
+            name='RhymeEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('line', models.PositiveIntegerField()),
+                ('rhyme_key', models.CharField(max_length=64)),
+                ('word', models.CharField(max_length=100)),
+                ('text', models.TextField()),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rhymes', to='main_app.document')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['rhyme_key', 'id'], name='rhymeentry_key_id')],
+            },
+        ),
+    ]
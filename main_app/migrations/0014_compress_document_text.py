@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:40
+
+from django.db import migrations
+
+import main_app.fields
+
+BATCH_SIZE = 200
+
+
+def _copy(apps, pairs):
+    Document = apps.get_model("main_app", "Document")
+    sources = [source for source, _ in pairs]
+    targets = [target for _, target in pairs]
+    batch = []
+    for doc in Document.objects.only("pk", *sources).order_by("pk").iterator(chunk_size=BATCH_SIZE):
+        for source, target in pairs:
+            setattr(doc, target, getattr(doc, source))
+        batch.append(doc)
+        if len(batch) >= BATCH_SIZE:
+            Document.objects.bulk_update(batch, targets)
+            batch = []
+    if batch:
+        Document.objects.bulk_update(batch, targets)
+
+
+def compress_rows(apps, schema_editor):
+    _copy(apps, [("formatted_text", "formatted_text_z"), ("line_stats", "line_stats_z")])
+
+
+def decompress_rows(apps, schema_editor):
+    _copy(apps, [("formatted_text_z", "formatted_text"), ("line_stats_z", "line_stats")])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0013_rhyme_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='formatted_text_z',
+            field=main_app.fields.CompressedRichTextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='line_stats_z',
+            field=main_app.fields.CompressedJSONField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(compress_rows, decompress_rows),
+        migrations.RemoveField(
+            model_name='document',
+            name='formatted_text',
+        ),
+        migrations.RemoveField(
+            model_name='document',
+            name='line_stats',
+        ),
+        migrations.RenameField(
+            model_name='document',
+            old_name='formatted_text_z',
+            new_name='formatted_text',
+        ),
+        migrations.RenameField(
+            model_name='document',
+            old_name='line_stats_z',
+            new_name='line_stats',
+        ),
+    ]
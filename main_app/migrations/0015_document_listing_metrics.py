@@ -0,0 +1,82 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:30
+
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+METRIC_FIELDS = ("flesch_reading_ease", "syllables_per_word", "syllables_per_line")
+
+
+def readability(word_count, sentence_count, line_count, syllable_count):
+    # Same formulas as utils.readability()
+    if not word_count:
+        return 0.0, 0.0, 0.0
+    syllables_per_word = syllable_count / word_count
+    flesch = 206.835 - 1.015 * word_count / max(1, sentence_count) - 84.6 * syllables_per_word
+    syllables_per_line = syllable_count / line_count if line_count else 0.0
+    return round(flesch, 2), round(syllables_per_word, 2), round(syllables_per_line, 2)
+
+
+def fill_metrics(apps, schema_editor):
+    Document = apps.get_model("main_app", "Document")
+    counts = ("word_count", "sentence_count", "line_count", "syllable_count")
+    batch = []
+    for doc in Document.objects.only("pk", *counts).order_by("pk").iterator(chunk_size=BATCH_SIZE):
+        values = readability(*(getattr(doc, f) for f in counts))
+        for field, value in zip(METRIC_FIELDS, values):
+            setattr(doc, field, value)
+        batch.append(doc)
+        if len(batch) >= BATCH_SIZE:
+            Document.objects.bulk_update(batch, METRIC_FIELDS)
+            batch = []
+    if batch:
+        Document.objects.bulk_update(batch, METRIC_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0014_compress_document_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='flesch_reading_ease',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='syllables_per_line',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='syllables_per_word',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(fill_metrics, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['word_count', 'id'], name='document_words_id'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['line_count', 'id'], name='document_lines_id'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['syllable_count', 'id'], name='document_syllables_id'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['syllables_per_line', 'id'], name='document_syl_line_id'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['syllables_per_word', 'id'], name='document_syl_word_id'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['flesch_reading_ease', 'id'], name='document_flesch_id'),
+        ),
+    ]
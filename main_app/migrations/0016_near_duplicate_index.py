@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0015_document_listing_metrics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='minhash',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='near_duplicate_of',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='main_app.document'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='near_duplicate_similarity',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='MinHashBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField()),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='minhash_buckets', to='main_app.document')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['key'], name='minhashbucket_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,93 @@
+"""
+MinHash signatures and LSH buckets for near-duplicate detection.
+
+A piece's plain text is lowercased into words and cut into overlapping
+SHINGLE_WORDS-word shingles. Its signature is, for each of NUM_PERM
+hash functions h(x) = (a*x + b) mod PRIME, the minimum over its shingles,
+packed as little-endian uint32 in Document.minhash. The fraction of
+positions where two signatures agree estimates the Jaccard similarity of
+their shingle sets.
+
+For lookup the signature is cut into BANDS bands of ROWS values; each band
+hashes to one bucket key (MinHashBucket rows). Pieces sharing any bucket
+are candidates, and only those have their signatures compared. With 16
+bands of 8 rows, pieces 80% similar share a bucket 95% of the time and
+pieces 50% similar about 6% of the time.
+"""
+import hashlib
+import random
+
+import numpy as np
+
+from .rhyme import line_text
+from .scansion import SCAN_WORD_RE
+
+SHINGLE_WORDS = 3
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+PRIME = (1 << 31) - 1
+SEED = 20240611  # fixed: stored signatures must stay comparable
+DTYPE = np.dtype("<u4")
+# Shingles hashed per block, bounding the (block, NUM_PERM) intermediate
+BLOCK = 4096
+
+_rng = random.Random(SEED)
+_A = np.array([_rng.randrange(1, PRIME) for _ in range(NUM_PERM)], dtype=np.int64)
+_B = np.array([_rng.randrange(0, PRIME) for _ in range(NUM_PERM)], dtype=np.int64)
+
+
+def words(line_stats) -> list[str]:
+    """The piece's words, lowercased, in order (blank lines skipped)."""
+    result = []
+    for line in line_stats or []:
+        if line.get("words", 0) == -1:
+            continue
+        text = line_text(line.get("text", ""))
+        result.extend(word.lower().replace("’", "'") for word in SCAN_WORD_RE.findall(text))
+    return result
+
+
+def shingles(tokens) -> set[str]:
+    """Distinct SHINGLE_WORDS-word shingles (the whole text if it is shorter)."""
+    if len(tokens) < SHINGLE_WORDS:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + SHINGLE_WORDS]) for i in range(len(tokens) - SHINGLE_WORDS + 1)}
+
+
+def _shingle_hash(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+def signature(line_stats) -> bytes | None:
+    """Packed MinHash signature of a piece's line stats (None when it has no words)."""
+    found = shingles(words(line_stats))
+    if not found:
+        return None
+    hashes = np.fromiter((_shingle_hash(s) for s in found), dtype=np.int64, count=len(found)) % PRIME
+    minimum = np.full(NUM_PERM, PRIME, dtype=np.int64)
+    for start in range(0, len(hashes), BLOCK):
+        block = hashes[start:start + BLOCK, None]
+        np.minimum(minimum, ((block * _A + _B) % PRIME).min(axis=0), out=minimum)
+    return minimum.astype(DTYPE).tobytes()
+
+
+def unpack(blob) -> np.ndarray:
+    return np.frombuffer(bytes(blob), dtype=DTYPE)
+
+
+def similarity(a, b) -> float:
+    """Estimated Jaccard similarity of two packed signatures."""
+    return float(np.mean(unpack(a) == unpack(b)))
+
+
+def band_keys(blob) -> list[int]:
+    """One signed 64-bit bucket key per band; the band number is part of the key."""
+    values = unpack(blob)
+    keys = []
+    for band in range(BANDS):
+        digest = hashlib.blake2b(
+            values[band * ROWS:(band + 1) * ROWS].tobytes(), digest_size=8, person=band.to_bytes(2, "little")
+        ).digest()
+        keys.append(int.from_bytes(digest, "little", signed=True))
+    return keys
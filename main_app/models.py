@@ -1,13 +1,127 @@
-from django.db import models
-from ckeditor.fields import RichTextField
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.db.models.deletion import Collector
+from django.utils import timezone
+from collections import Counter
+import itertools
 import re
+import threading
+import time
+
+from . import executor, timing
+from .fields import CompressedJSONField, CompressedRichTextField
+from .heatmap import pack_line_metrics
+from . import minhash
+from .rhyme import last_word, line_rhyme_key, line_text, rhyme_scheme
+from .scansion import dominant_meter
+from .utils import (
+    ANALYZER_VERSION,
+    analyze_docx,
+    analyze_html,
+    hash_docx,
+    hash_html,
+    process_docx_perline,
+    process_html_perline,
+    readability,
+)
+
+# Per-document counts summed into AuthorStats / CorpusStats
+COUNT_FIELDS = (
+    "word_count", "char_count", "sentence_count", "line_count", "paragraph_count", "syllable_count",
+)
+TOTAL_FIELDS = ("documents", *COUNT_FIELDS)
+# Everything analyze() derives from the source (reset together when it changes)
+DERIVED_FIELDS = (
+    *COUNT_FIELDS,
+    "flesch_reading_ease", "syllables_per_word", "syllables_per_line",
+    "line_stats", "line_metrics", "minhash", "content_hash", "meter", "rhyme_scheme",
+    "near_duplicate_of", "near_duplicate_similarity",
+)
+
+# Signatures compared per near-duplicate lookup (see MinHashBucket.near_duplicates)
+MAX_NEAR_DUPLICATE_CANDIDATES = 50
+
+# CacheCounter increments not yet written, per process (see CacheCounter.increment)
+_counter_lock = threading.Lock()
+_pending_counts = Counter()
+_counts_flushed_at = time.monotonic()
+# AnalysisCacheEntry.store() calls in this process (see AnalysisCacheEntry.store)
+_cache_stores = itertools.count(1)
+
+
+class DocumentQuerySet(models.QuerySet):
+    def _removal_deltas(self):
+        # The rows' share of the aggregates, from one grouped query rather than per instance
+        removed = self.order_by().values("author").annotate(
+            documents=models.Count("id"), **{f: models.Sum(f) for f in COUNT_FIELDS}
+        )
+        return {row["author"]: [-(row[f] or 0) for f in TOTAL_FIELDS] for row in removed}
+
+    def delete(self):
+        with transaction.atomic():
+            deltas = self._removal_deltas()
+            result = super().delete()
+            AuthorStats.apply_deltas(deltas)
+        return result
+
+    def bulk_delete(self):
+        """
+        delete() for large batches: the rows are loaded without their
+        compressed text, and their search entries go in one statement instead
+        of one per row from the post_delete receiver (see signals.py).
+        """
+        from . import search  # search imports this module
+
+        with transaction.atomic():
+            docs = list(self.only("pk"))
+            for doc in docs:
+                doc._search_removed = True
+            pks = [doc.pk for doc in docs]  # the collector clears them
+            deltas = self._removal_deltas()
+            collector = Collector(using=self.db, origin=self)
+            collector.collect(docs)
+            result = collector.delete()
+            AuthorStats.apply_deltas(deltas)
+            search.remove_documents(pks)
+        return result
+
+    def bulk_create(self, objs, *args, **kwargs):
+        with transaction.atomic():
+            created = super().bulk_create(objs, *args, **kwargs)
+            deltas = {}
+            for doc in created:
+                AuthorStats.add_delta(deltas, doc.author, doc.stats_contribution())
+                doc._stats_snapshot = (doc.author, doc.stats_contribution())
+            AuthorStats.apply_deltas(deltas)
+        return created
+
+
+class DocumentManager(models.Manager.from_queryset(DocumentQuerySet)):
+    def get_queryset(self):
+        # The search vector is only ever read by the database
+        return super().get_queryset().defer("search_vector")
+
 
 class Document(models.Model):
+    STATUS_PENDING = "pending"
+    STATUS_PROCESSING = "processing"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_PROCESSING, "Processing"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
     title = models.CharField(max_length=255)
     author = models.CharField(max_length=255)
 
     uploaded_file = models.FileField(upload_to="uploads/", blank=True, null=True)
-    formatted_text = RichTextField(blank=True, null=True)
+    # Stored zlib-compressed (see fields.py)
+    formatted_text = CompressedRichTextField(blank=True, null=True)
 
     # Counts
     word_count = models.PositiveIntegerField(default=0)
@@ -17,13 +131,198 @@ class Document(models.Model):
     paragraph_count = models.PositiveIntegerField(default=0)
     syllable_count = models.PositiveIntegerField(default=0)
 
+    # Derived from the counts at analysis time (see utils.readability)
+    flesch_reading_ease = models.FloatField(default=0)
+    syllables_per_word = models.FloatField(default=0)
+    syllables_per_line = models.FloatField(default=0)
+
+    # Per-line analysis, filled at upload time (None = not computed yet), compressed
+    line_stats = CompressedJSONField(blank=True, null=True, editable=False)
+    # The same lines as a packed int16 array for NumPy (see heatmap.py)
+    line_metrics = models.BinaryField(blank=True, null=True, editable=False)
+    # MinHash signature of the text's word shingles (see minhash.py), indexed by MinHashBucket
+    minhash = models.BinaryField(blank=True, null=True, editable=False)
+    # An earlier piece this one is probably a revision of (estimated Jaccard similarity)
+    near_duplicate_of = models.ForeignKey(
+        "self", on_delete=models.SET_NULL, blank=True, null=True, editable=False, related_name="+"
+    )
+    near_duplicate_similarity = models.FloatField(blank=True, null=True, editable=False)
+
+    # Full-text search document (Postgres; SQLite uses an FTS5 table, see search.py)
+    search_vector = SearchVectorField(blank=True, null=True, editable=False)
+
+    # sha256 of the uploaded file bytes / normalized pasted HTML
+    content_hash = models.CharField(max_length=64, blank=True, default="", db_index=True)
+
+    # Dominant meter across the lines (e.g. "iambic pentameter")
+    meter = models.CharField(max_length=40, blank=True, default="")
+    # Rhyme scheme by stanza (e.g. "ABAB CDCD"), see rhyme.py
+    rhyme_scheme = models.TextField(blank=True, default="")
+
+    # Background analysis state (see AnalysisJob)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_DONE)
+    analysis_error = models.TextField(blank=True, default="")
+
     # Slug & timestamps
     slug = models.SlugField(unique=True, blank=True)  # URL-safe identifier
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = DocumentManager()
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of the pieces index (newest first)
+            models.Index(fields=["-created_at", "-id"], name="document_created_id_desc"),
+            # Range filters and keyset-paged sorts on each listing metric (see listing.py)
+            models.Index(fields=["word_count", "id"], name="document_words_id"),
+            models.Index(fields=["line_count", "id"], name="document_lines_id"),
+            models.Index(fields=["syllable_count", "id"], name="document_syllables_id"),
+            models.Index(fields=["syllables_per_line", "id"], name="document_syl_line_id"),
+            models.Index(fields=["syllables_per_word", "id"], name="document_syl_word_id"),
+            models.Index(fields=["flesch_reading_ease", "id"], name="document_flesch_id"),
+        ]
 
     def __str__(self):
         return f"{self.title} by {self.author}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember which source the stored line stats belong to
+        if "uploaded_file" in field_names and "formatted_text" in field_names:
+            instance._analyzed_source = instance.source_key()
+        # ...and what this row currently contributes to the aggregates
+        if {"author", *COUNT_FIELDS} <= set(field_names):
+            instance._stats_snapshot = (instance.author, instance.stats_contribution())
+        # ...and the names the search index has for it
+        if "title" in field_names and "author" in field_names:
+            instance._saved_names = (instance.title, instance.author)
+        return instance
+
+    @property
+    def analysis_changed(self):
+        """Whether the analysis fields were recomputed or reset since the last save."""
+        return getattr(self, "_analysis_changed", False)
+
+    def names_changed(self):
+        return (self.title, self.author) != getattr(self, "_saved_names", None)
+
+    def stats_contribution(self):
+        """This document's share of the AuthorStats / CorpusStats totals."""
+        return [1, *(getattr(self, f) for f in COUNT_FIELDS)]
+
+    def stored_stats_contribution(self):
+        """(author, contribution) as currently saved, or None for an unsaved document."""
+        if self._state.adding:
+            return None
+        snapshot = getattr(self, "_stats_snapshot", None)
+        if snapshot is not None:
+            return snapshot
+        row = Document.objects.filter(pk=self.pk).values_list("author", *COUNT_FIELDS).first()
+        return (row[0], [1, *row[1:]]) if row else None
+
+    @property
+    def cache_version(self):
+        """Changes whenever the rendered page for this document can change."""
+        return f"{self.updated_at.timestamp():.6f}-{self.status}-{ANALYZER_VERSION}"
+
+    def fragment_key(self, name):
+        return f"{name}:{self.pk}:{self.cache_version}"
+
+    @property
+    def etag(self):
+        return f'"{self.pk}-{self.cache_version}"'
+
+    def source_key(self):
+        """Identify the content the analysis is derived from."""
+        if self.uploaded_file:
+            return ("file", self.uploaded_file.name)
+        return ("html", self.formatted_text or "")
+
+    def analyze(self):
+        """
+        Run the full analysis on the uploaded file (or pasted HTML) and store
+        the document counts and the per-line stats on this instance. Identical
+        content analyzed before is served from the AnalysisCacheEntry table.
+        """
+        hasher, analyzer, source = self._analysis_steps()
+        with timing.stage("hash"):
+            self.content_hash = hasher(source)
+
+        with timing.stage("analysis_cache.lookup"):
+            cached = AnalysisCacheEntry.lookup(self.content_hash)
+        if cached is not None:
+            summary, line_stats = cached
+        else:
+            summary, line_stats = analyzer(source)
+            with timing.stage("analysis_cache.store"):
+                AnalysisCacheEntry.store(self.content_hash, summary, line_stats)
+
+        self.apply_analysis(summary, line_stats)
+
+    async def aanalyze(self):
+        """analyze() for async views: hashing and analysis run on the analysis executor."""
+        hasher, analyzer, source = self._analysis_steps()
+        with timing.stage("hash"):
+            self.content_hash = await executor.run(hasher, source)
+
+        with timing.stage("analysis_cache.lookup"):
+            cached = await sync_to_async(AnalysisCacheEntry.lookup)(self.content_hash)
+        if cached is not None:
+            summary, line_stats = cached
+        else:
+            summary, line_stats = await executor.run(analyzer, source)
+            with timing.stage("analysis_cache.store"):
+                await sync_to_async(AnalysisCacheEntry.store)(
+                    self.content_hash, summary, line_stats
+                )
+
+        self.apply_analysis(summary, line_stats)
+
+    def _analysis_steps(self):
+        """(hasher, analyzer, source) for the uploaded file, or else the pasted HTML."""
+        if self.uploaded_file:
+            return hash_docx, analyze_docx, self.uploaded_file.path
+        return hash_html, analyze_html, self.formatted_text or ""
+
+    def apply_analysis(self, summary, line_stats):
+        """Copy an analyzer result ((html, counts...), line_stats) onto this document."""
+        (
+            self.formatted_text,
+            self.word_count,
+            self.char_count,
+            self.sentence_count,
+            self.line_count,
+            self.paragraph_count,
+            self.syllable_count,
+        ) = summary
+        (
+            self.flesch_reading_ease,
+            self.syllables_per_word,
+            self.syllables_per_line,
+        ) = readability(self.word_count, self.sentence_count, self.line_count, self.syllable_count)
+        self.line_stats = line_stats
+        self.line_metrics = pack_line_metrics(line_stats)
+        self.minhash = minhash.signature(line_stats)
+        self.meter = dominant_meter(line_stats)
+        self.rhyme_scheme = rhyme_scheme(line_stats)
+        self._analyzed_source = self.source_key()
+        self._analysis_changed = True
+
+    def refresh_line_stats(self):
+        """Recompute only the per-line stats from the stored source."""
+        if self.uploaded_file:
+            self.line_stats = process_docx_perline(self.uploaded_file.path)
+        else:
+            self.line_stats = process_html_perline(self.formatted_text or "")
+        self.line_metrics = pack_line_metrics(self.line_stats)
+        self.minhash = minhash.signature(self.line_stats)
+        self.meter = dominant_meter(self.line_stats)
+        self.rhyme_scheme = rhyme_scheme(self.line_stats)
+        self._analyzed_source = self.source_key()
+        self._analysis_changed = True
+
     def camel_case(self, s):
         s = re.sub(r"[^a-zA-Z0-9 ]+", "", s)  # remove non-alphanum chars
         parts = s.split()
@@ -34,6 +333,27 @@ class Document(models.Model):
         author_part = self.camel_case(self.author)
         return f"{title_part}_{author_part}"
 
+    @classmethod
+    def assign_unique_slugs(cls, docs):
+        """
+        Give unsaved documents unique slugs using one query for the existing
+        ones, following the same base/base_1/base_2 scheme as save().
+        """
+        bases = [(doc, doc.generate_slug()) for doc in docs]
+        query = models.Q()
+        for base in {base for _, base in bases}:
+            query |= models.Q(slug=base) | models.Q(slug__startswith=f"{base}_")
+        taken = set(cls.objects.filter(query).values_list("slug", flat=True)) if bases else set()
+
+        for doc, base in bases:
+            slug = base
+            counter = 1
+            while slug in taken:
+                slug = f"{base}_{counter}"
+                counter += 1
+            taken.add(slug)
+            doc.slug = slug
+
     def save(self, *args, **kwargs):
         if not self.slug:
             base_slug = self.generate_slug()
@@ -43,4 +363,477 @@ class Document(models.Model):
                 slug = f"{base_slug}_{counter}"
                 counter += 1
             self.slug = slug
-        super().save(*args, **kwargs)
+
+        # Source changed since the stats were computed: everything derived from it
+        # is stale. Re-analyze now, or reset it and queue a job when the queue runs.
+        # (A new row may get its file after the analysis, as import_documents does.)
+        analyzed = getattr(self, "_analyzed_source", None)
+        requeue = False
+        if not self._state.adding and analyzed is not None and analyzed != self.source_key():
+            from .jobs import enqueue_analysis, queue_enabled  # jobs imports this module
+
+            if queue_enabled():
+                self.reset_analysis()
+                requeue = True
+            else:
+                self.analyze()
+                self.status = self.STATUS_DONE
+                self.analysis_error = ""
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {
+                    *kwargs["update_fields"], *DERIVED_FIELDS, "formatted_text", "status", "analysis_error",
+                }
+
+        # Every save moves updated_at, which versions the cached detail page
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "updated_at"}
+
+        # Keep the author/corpus aggregates in step with this row
+        if update_fields is not None and not {"author", *COUNT_FIELDS} & set(update_fields):
+            super().save(*args, **kwargs)
+            self._mark_saved()
+            return
+        with transaction.atomic():
+            previous = self.stored_stats_contribution()
+            super().save(*args, **kwargs)
+            current = (self.author, self.stats_contribution())
+            AuthorStats.record_change(previous, current)
+        self._stats_snapshot = current
+        self._mark_saved()
+        if requeue:
+            enqueue_analysis(self)
+
+    def _mark_saved(self):
+        # The post_save index receivers have seen this state (see signals.py)
+        self._analysis_changed = False
+        self._saved_names = (self.title, self.author)
+
+    def reset_analysis(self):
+        """Clear every field derived from the source and mark the document pending."""
+        for name in DERIVED_FIELDS:
+            field = self._meta.get_field(name)
+            setattr(self, field.attname, field.get_default())
+        if self.uploaded_file:
+            # Rendered from the old file; the pasted-HTML source is kept as is
+            self.formatted_text = None
+        self.status = self.STATUS_PENDING
+        self.analysis_error = ""
+        self._analyzed_source = None
+        self._analysis_changed = True
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            previous = self.stored_stats_contribution()
+            result = super().delete(*args, **kwargs)
+            AuthorStats.record_change(previous, None)
+        return result
+
+    def flag_near_duplicate(self):
+        """
+        Point near_duplicate_of at the most similar earlier piece above
+        NEAR_DUPLICATE_THRESHOLD (or clear it). Written with update() only when
+        it changes, so it can run from post_save; needs this piece's buckets
+        indexed first.
+        """
+        match, similarity = None, None
+        if self.minhash:
+            found = MinHashBucket.near_duplicates(self)
+            if found:
+                similarity, match = found[0]
+        current = (self.near_duplicate_of_id, self.near_duplicate_similarity)
+        if (getattr(match, "pk", None), similarity) == current:
+            return
+        self.near_duplicate_of = match
+        self.near_duplicate_similarity = similarity
+        # A new updated_at re-versions the cached detail page, which shows the flag
+        self.updated_at = timezone.now()
+        Document.objects.filter(pk=self.pk).update(
+            near_duplicate_of=match, near_duplicate_similarity=similarity, updated_at=self.updated_at
+        )
+
+
+class AnalysisJob(models.Model):
+    """A queued analysis run, picked up by `manage.py analysis_worker`."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name="analysis_jobs")
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=QUEUED)
+
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)  # retry backoff
+
+    # Lease: a RUNNING job whose lock is older than the lease is assumed crashed
+    locked_by = models.CharField(max_length=100, blank=True, default="")
+    locked_at = models.DateTimeField(blank=True, null=True)
+
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="analysisjob_status_run_after"),
+        ]
+
+    def __str__(self):
+        return f"Analysis of {self.document_id} ({self.status})"
+
+
+class RhymeEntry(models.Model):
+    """
+    Inverted rhyme index: one row per analyzed line, keyed by the rhyme key
+    of its last word, so "lines that rhyme with X" is an index range scan.
+    Rebuilt from a document's line stats whenever they are saved.
+    """
+
+    document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name="rhymes")
+    line = models.PositiveIntegerField()  # position in line_stats
+    rhyme_key = models.CharField(max_length=64)
+    word = models.CharField(max_length=100)
+    text = models.TextField()
+
+    class Meta:
+        indexes = [
+            # Lookups by key, paged in id order
+            models.Index(fields=["rhyme_key", "id"], name="rhymeentry_key_id"),
+        ]
+
+    def __str__(self):
+        return f"{self.word} ({self.rhyme_key})"
+
+    @staticmethod
+    def entries_for(doc):
+        entries = []
+        for i, line in enumerate(doc.line_stats or []):
+            key = line.get("rhyme")
+            if not key:
+                continue
+            text = line_text(line.get("text", ""))
+            entries.append(RhymeEntry(
+                document_id=doc.pk,
+                line=i,
+                rhyme_key=key[:64],
+                word=last_word(text)[:100],
+                text=text,
+            ))
+        return entries
+
+    @classmethod
+    def index_documents(cls, docs):
+        """Replace the entries of saved documents with ones from their current line stats."""
+        docs = [doc for doc in docs if doc.pk is not None]
+        with transaction.atomic():
+            cls.objects.filter(document_id__in=[doc.pk for doc in docs]).delete()
+            cls.objects.bulk_create(
+                [entry for doc in docs for entry in cls.entries_for(doc)], batch_size=1000
+            )
+
+    @classmethod
+    def rhymes_with(cls, text, exclude_word=True):
+        """
+        (rhyme key, queryset of entries rhyming with the last word of `text`)
+        in id order; the key is "" (and the queryset empty) without a word.
+        """
+        key = line_rhyme_key(text)
+        entries = cls.objects.filter(rhyme_key=key[:64]) if key else cls.objects.none()
+        if key and exclude_word:
+            # The same word again is a repetition, not a rhyme
+            entries = entries.exclude(word=last_word(text)[:100])
+        return key, entries.order_by("id")
+
+
+class MinHashBucket(models.Model):
+    """
+    LSH index over the MinHash signatures: one row per band of a piece's
+    signature (see minhash.py). Pieces sharing a bucket key are candidate
+    near-duplicates; nothing else is compared. Rebuilt from a document's
+    signature whenever its line stats are saved.
+    """
+
+    document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name="minhash_buckets")
+    key = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["key"], name="minhashbucket_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({self.document_id})"
+
+    @staticmethod
+    def buckets_for(doc):
+        if not doc.minhash:
+            return []
+        return [MinHashBucket(document_id=doc.pk, key=key) for key in minhash.band_keys(doc.minhash)]
+
+    @classmethod
+    def index_documents(cls, docs):
+        """Replace the buckets of saved documents with ones from their current signatures."""
+        docs = [doc for doc in docs if doc.pk is not None]
+        with transaction.atomic():
+            cls.objects.filter(document_id__in=[doc.pk for doc in docs]).delete()
+            cls.objects.bulk_create(
+                [bucket for doc in docs for bucket in cls.buckets_for(doc)], batch_size=1000
+            )
+
+    @classmethod
+    def near_duplicates(cls, doc, threshold=None):
+        """
+        [(similarity, document)] for earlier pieces sharing a bucket with
+        `doc` whose signatures are at least `threshold` similar, best first.
+        """
+        if threshold is None:
+            threshold = getattr(settings, "NEAR_DUPLICATE_THRESHOLD", 0.8)
+        # Only the pieces sharing the most bands are compared, however many copies exist
+        candidates = list(
+            cls.objects.filter(key__in=minhash.band_keys(doc.minhash), document_id__lt=doc.pk)
+            .values("document_id")
+            .annotate(shared=models.Count("id"))
+            .order_by("-shared", "-document_id")
+            .values_list("document_id", flat=True)[:MAX_NEAR_DUPLICATE_CANDIDATES]
+        )
+        found = [
+            (minhash.similarity(doc.minhash, other.minhash), other)
+            for other in Document.objects.filter(pk__in=candidates, minhash__isnull=False)
+            .only("title", "author", "slug", "minhash")
+        ]
+        found = [(round(similarity, 3), other) for similarity, other in found if similarity >= threshold]
+        return sorted(found, key=lambda pair: (-pair[0], -pair[1].pk))
+
+
+class CacheCounter(models.Model):
+    """
+    Named counters (cache hits/misses/evictions). Increments are summed in
+    memory and written with F() updates: at the end of each request, every
+    CACHE_COUNTER_FLUSH_SECONDS inside long runs (imports, workers), and when
+    the process exits (see signals.py).
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+    @classmethod
+    def increment(cls, name, by=1):
+        with _counter_lock:
+            _pending_counts[name] += by
+            due = time.monotonic() - _counts_flushed_at >= getattr(settings, "CACHE_COUNTER_FLUSH_SECONDS", 10)
+        if due:
+            cls.flush()
+
+    @classmethod
+    def flush(cls):
+        """Write this process's pending increments."""
+        global _counts_flushed_at
+        if not _pending_counts:
+            return
+        with _counter_lock:
+            pending = dict(_pending_counts)
+            _pending_counts.clear()
+            _counts_flushed_at = time.monotonic()
+        for name, by in pending.items():
+            if not cls.objects.filter(name=name).update(value=models.F("value") + by):
+                cls.objects.get_or_create(name=name)
+                cls.objects.filter(name=name).update(value=models.F("value") + by)
+
+
+class AnalysisCacheEntry(models.Model):
+    """
+    Analyzer output keyed by content hash and analyzer version, so a
+    re-upload of the same file/HTML reuses the stored HTML, counts and
+    line stats. Bounded by ANALYSIS_CACHE_MAX_ENTRIES (least recently used
+    entries are evicted first), checked every ANALYSIS_CACHE_EVICT_EVERY
+    stores, so the table can briefly run over by about that many rows.
+    """
+
+    content_hash = models.CharField(max_length=64)
+    analyzer_version = models.PositiveIntegerField()
+    result = models.JSONField()
+
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_hash", "analyzer_version"], name="analysiscache_hash_version"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.content_hash[:12]} (v{self.analyzer_version})"
+
+    @classmethod
+    def lookup(cls, content_hash):
+        """((html, counts...), line_stats) for a hash, or None on a miss."""
+        return cls.lookup_many([content_hash]).get(content_hash)
+
+    @classmethod
+    def lookup_many(cls, content_hashes):
+        """{hash: ((html, counts...), line_stats)} for the hashes that are cached."""
+        entries = list(
+            cls.objects.filter(
+                content_hash__in=set(content_hashes), analyzer_version=ANALYZER_VERSION
+            )
+        )
+        found = {}
+        for entry in entries:
+            found[entry.content_hash] = (tuple(entry.result["summary"]), entry.result["line_stats"])
+
+        if entries:
+            cls.objects.filter(pk__in=[e.pk for e in entries]).update(
+                hits=models.F("hits") + 1, last_used_at=timezone.now()
+            )
+            CacheCounter.increment("analysis_cache.hits", len(entries))
+        misses = len(set(content_hashes)) - len(entries)
+        if misses:
+            CacheCounter.increment("analysis_cache.misses", misses)
+        return found
+
+    @classmethod
+    def store(cls, content_hash, summary, line_stats):
+        cls.objects.update_or_create(
+            content_hash=content_hash,
+            analyzer_version=ANALYZER_VERSION,
+            defaults={
+                "result": {"summary": list(summary), "line_stats": line_stats},
+                "last_used_at": timezone.now(),
+            },
+        )
+        # Counting the table on every store costs more than the occasional overshoot
+        if next(_cache_stores) % getattr(settings, "ANALYSIS_CACHE_EVICT_EVERY", 50) == 0:
+            cls.evict()
+
+    @classmethod
+    def evict(cls):
+        """
+        Drop entries from other analyzer versions (never looked up again),
+        then the least recently used ones beyond the configured size.
+        """
+        deleted, _ = cls.objects.exclude(analyzer_version=ANALYZER_VERSION).delete()
+        max_entries = getattr(settings, "ANALYSIS_CACHE_MAX_ENTRIES", 5000)
+        excess = cls.objects.count() - max_entries
+        if excess > 0:
+            stale = cls.objects.order_by("last_used_at").values_list("pk", flat=True)[:excess]
+            deleted += cls.objects.filter(pk__in=list(stale)).delete()[0]
+        if deleted:
+            CacheCounter.increment("analysis_cache.evictions", deleted)
+
+
+class StatsTotals(models.Model):
+    """Summed document counts, kept current by Document.save()/delete() and DocumentQuerySet."""
+
+    documents = models.BigIntegerField(default=0)
+    word_count = models.BigIntegerField(default=0)
+    char_count = models.BigIntegerField(default=0)
+    sentence_count = models.BigIntegerField(default=0)
+    line_count = models.BigIntegerField(default=0)
+    paragraph_count = models.BigIntegerField(default=0)
+    syllable_count = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        abstract = True
+
+    @staticmethod
+    def _ratio(numerator, denominator):
+        return round(numerator / denominator, 2) if denominator else 0
+
+    @property
+    def avg_words_per_document(self):
+        return self._ratio(self.word_count, self.documents)
+
+    @property
+    def avg_lines_per_document(self):
+        return self._ratio(self.line_count, self.documents)
+
+    @property
+    def avg_syllables_per_line(self):
+        return self._ratio(self.syllable_count, self.line_count)
+
+    @property
+    def avg_words_per_line(self):
+        return self._ratio(self.word_count, self.line_count)
+
+    @property
+    def avg_syllables_per_word(self):
+        return self._ratio(self.syllable_count, self.word_count)
+
+    @classmethod
+    def _increments(cls, delta):
+        updates = {f: models.F(f) + d for f, d in zip(TOTAL_FIELDS, delta) if d}
+        if updates:
+            updates["updated_at"] = timezone.now()
+        return updates
+
+
+class CorpusStats(StatsTotals):
+    """Totals for the whole corpus: a single row (pk=1)."""
+
+    def __str__(self):
+        return f"Corpus ({self.documents} documents)"
+
+    @classmethod
+    def current(cls):
+        return cls.objects.get_or_create(pk=1)[0]
+
+
+class AuthorStats(StatsTotals):
+    """Totals for one author; rows are dropped when the author's last document goes."""
+
+    author = models.CharField(max_length=255, unique=True)
+
+    def __str__(self):
+        return f"{self.author} ({self.documents} documents)"
+
+    @staticmethod
+    def add_delta(deltas, author, contribution, sign=1):
+        total = deltas.setdefault(author, [0] * len(TOTAL_FIELDS))
+        for i, value in enumerate(contribution):
+            total[i] += sign * value
+
+    @classmethod
+    def record_change(cls, previous, current):
+        """Move one document's contribution from `previous` to `current` ((author, counts) or None)."""
+        deltas = {}
+        if previous is not None:
+            cls.add_delta(deltas, *previous, sign=-1)
+        if current is not None:
+            cls.add_delta(deltas, *current)
+        cls.apply_deltas(deltas)
+
+    @classmethod
+    def apply_deltas(cls, deltas):
+        """Add {author: [documents, word_count, ...]} to the author rows and the corpus row."""
+        corpus = [0] * len(TOTAL_FIELDS)
+        with transaction.atomic():
+            for author, delta in deltas.items():
+                updates = cls._increments(delta)
+                if not updates:
+                    continue
+                if not cls.objects.filter(author=author).update(**updates):
+                    cls.objects.get_or_create(author=author)
+                    cls.objects.filter(author=author).update(**updates)
+                corpus = [a + b for a, b in zip(corpus, delta)]
+
+            updates = CorpusStats._increments(corpus)
+            if updates and not CorpusStats.objects.filter(pk=1).update(**updates):
+                CorpusStats.objects.get_or_create(pk=1)
+                CorpusStats.objects.filter(pk=1).update(**updates)
+            cls.objects.filter(author__in=list(deltas), documents__lte=0).delete()
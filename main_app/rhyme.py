@@ -0,0 +1,79 @@
+"""
+Rhyme keys and rhyme schemes.
+
+A word's rhyme key is its cmudict phonemes from the last stressed vowel
+on, without stress digits ("day" and "away" -> "EY", "nation" and
+"station" -> "EY SH AH N"); see syllable_index.rhyme_phonemes. Words
+outside cmudict get a spelling key from their last vowel group on,
+marked with "~" so it never equals a phoneme key ("glorp" -> "~orp").
+
+A line rhymes on its last word. Each analyzed line record stores that
+key as "rhyme", and RhymeEntry indexes the keys across the corpus.
+"""
+import html
+import re
+import string
+
+from . import scansion, syllable_index
+
+SPELLING_RHYME_RE = re.compile(r"[aeiouy]+[^aeiouy]*$")
+TAG_RE = re.compile(r"<[^>]+>")
+BR_RE = re.compile(r"<br\s*/?>", re.IGNORECASE)
+
+# Scheme letters, in order of first appearance; later keys share "*"
+SCHEME_LETTERS = string.ascii_uppercase + string.ascii_lowercase
+UNRHYMED = "-"  # a line with no word to rhyme on
+
+
+def rhyme_key(word: str) -> str:
+    """Rhyme key for one word ("" for a word with no letters)."""
+    word = word.lower().replace("’", "'")
+    phonemes = syllable_index.rhyme(word)
+    if phonemes:
+        return phonemes
+    letters = re.sub(r"[^a-z]", "", word)
+    match = SPELLING_RHYME_RE.search(letters)
+    if match:
+        return "~" + match.group()
+    return f"~{letters}" if letters else ""
+
+
+def last_word(text: str) -> str:
+    """The word a line of plain text rhymes on ("" if it has none)."""
+    words = scansion.SCAN_WORD_RE.findall(text)
+    return words[-1].lower().replace("’", "'") if words else ""
+
+
+def line_rhyme_key(text: str) -> str:
+    """Rhyme key of a line of plain text ("" if it has no words)."""
+    word = last_word(text)
+    return rhyme_key(word) if word else ""
+
+
+def line_text(line_html: str) -> str:
+    """Plain text of a stored line record's HTML."""
+    return html.unescape(TAG_RE.sub("", BR_RE.sub(" ", line_html))).strip()
+
+
+def rhyme_scheme(line_stats) -> str:
+    """
+    Rhyme scheme of a piece, e.g. "ABAB CDCD EFEF GG": one letter per line,
+    stanzas (runs of lines between blank lines) separated by spaces. Lines
+    sharing a rhyme key share a letter across the whole piece.
+    """
+    letters = {}
+    stanzas = [[]]
+    for line in line_stats or []:
+        if line.get("words", 0) == -1:
+            if stanzas[-1]:
+                stanzas.append([])
+            continue
+        key = line.get("rhyme", "")
+        if not key:
+            stanzas[-1].append(UNRHYMED)
+            continue
+        if key not in letters:
+            n = len(letters)
+            letters[key] = SCHEME_LETTERS[n] if n < len(SCHEME_LETTERS) else "*"
+        stanzas[-1].append(letters[key])
+    return " ".join("".join(stanza) for stanza in stanzas if stanza)
@@ -0,0 +1,151 @@
+"""
+Scansion: lexical stress per syllable and the best-fitting meter per line.
+
+Stress comes from the cmudict stress digits in the syllable index. Words
+that aren't in cmudict get a heuristic pattern from their spelling.
+
+A line's stress pattern is stored as one character per syllable:
+  "1"  primary stress (word of two or more syllables)
+  "2"  secondary stress
+  "0"  unstressed syllable
+  "M"  monosyllabic content word (usually stressed, can be demoted)
+  "m"  monosyllabic function word (usually unstressed, can be promoted)
+"""
+import re
+from collections import Counter
+
+from . import syllable_index, timing, utils
+
+SCAN_WORD_RE = re.compile(r"[A-Za-z]+(?:['’][A-Za-z]+)*")
+
+FUNCTION_WORDS = frozenset(
+    "a an the and but or nor for so yet as at by in of on to up with from into onto "
+    "than that this these those there their them they then thou thee thy thine "
+    "i me my mine we us our you your he him his she her it its is am are was were "
+    "be been has had have do does did shall should will would can could may might "
+    "must not no if when where while who whom whose which what how o oh".split()
+)
+
+FEET = {
+    "iambic": "01",
+    "trochaic": "10",
+    "anapestic": "001",
+    "dactylic": "100",
+}
+LENGTHS = {
+    1: "monometer",
+    2: "dimeter",
+    3: "trimeter",
+    4: "tetrameter",
+    5: "pentameter",
+    6: "hexameter",
+    7: "heptameter",
+    8: "octameter",
+}
+IRREGULAR = "irregular"
+
+# Cost of placing a syllable on a strong ("1") or weak ("0") metrical position
+COST = {
+    "1": {"1": 0.0, "0": 1.0},
+    "0": {"1": 1.0, "0": 0.0},
+    "2": {"1": 0.0, "0": 0.25},
+    "M": {"1": 0.0, "0": 0.5},
+    "m": {"1": 0.5, "0": 0.0},
+}
+# Average cost per syllable above which a line is called irregular
+MAX_COST = 0.3
+
+# Spelling rules for words outside cmudict: (suffix, stressed syllable from the end)
+SUFFIX_STRESS = (
+    ("ation", 2), ("ition", 2), ("tion", 2), ("sion", 2), ("ical", 3), ("ity", 3),
+    ("ic", 2), ("ian", 2), ("ial", 2), ("ious", 2), ("eer", 1), ("ee", 1),
+    ("ese", 1), ("ique", 1), ("oon", 1), ("ette", 1),
+)
+UNSTRESSED_PREFIXES = ("a", "be", "de", "re", "pre", "pro", "con", "com", "dis", "ex", "in", "un")
+
+
+def _heuristic_stress(word: str, syllables: int) -> str:
+    for suffix, from_end in SUFFIX_STRESS:
+        if word.endswith(suffix) and syllables >= from_end:
+            stressed = syllables - from_end
+            break
+    else:
+        if syllables == 2 and word.startswith(UNSTRESSED_PREFIXES):
+            stressed = 1
+        else:
+            stressed = 0
+    return "".join("1" if i == stressed else "0" for i in range(syllables))
+
+
+def word_stress(word: str) -> str:
+    """Stress code for one word (see module docstring)."""
+    word = word.lower().replace("’", "'")
+    digits = syllable_index.stress(word)
+    if timing.ENABLED:
+        timing.count("stress.cmudict" if digits is not None else "stress.heuristic")
+    if digits is None:
+        syllables = utils.count_syllables_in_word(word)
+        digits = _heuristic_stress(re.sub(r"[^a-z]", "", word), syllables) if syllables else ""
+
+    if len(digits) == 1:
+        return "m" if word in FUNCTION_WORDS else "M"
+    return digits
+
+
+def line_stress(text: str) -> str:
+    return "".join(word_stress(word) for word in SCAN_WORD_RE.findall(text))
+
+
+def _templates(length: int):
+    """(meter name, strong/weak template) pairs with exactly `length` syllables."""
+    for name, foot in FEET.items():
+        for feet, feet_name in LENGTHS.items():
+            base = foot * feet
+            variants = [base]
+            if base.endswith("1"):
+                variants.append(base + "0")  # feminine ending
+            if base.startswith("0"):
+                variants.append(base[1:])  # headless
+            if base.endswith("0"):
+                variants.append(base[:-1])  # catalectic
+            for template in variants:
+                if len(template) == length:
+                    yield f"{name} {feet_name}", template
+
+
+def detect_meter(stress: str) -> str:
+    """Best-fitting meter name for a line's stress code, or "irregular"."""
+    if len(stress) < 2:
+        return IRREGULAR
+
+    best_name, best_cost = IRREGULAR, None
+    for name, template in _templates(len(stress)):
+        cost = sum(COST[s][t] for s, t in zip(stress, template))
+        # Templates are generated iambic first, so ties favour the commoner meter
+        if best_cost is None or cost < best_cost:
+            best_name, best_cost = name, cost
+
+    if best_cost is None or best_cost / len(stress) > MAX_COST:
+        return IRREGULAR
+    return best_name
+
+
+def scan_line(text: str) -> tuple[str, str]:
+    """(stress code, meter) for a line of plain text."""
+    stress = line_stress(text)
+    return stress, detect_meter(stress)
+
+
+def dominant_meter(line_stats) -> str:
+    """The most common regular meter across a piece's lines ("" if none)."""
+    meters = Counter(
+        line["meter"] for line in line_stats or [] if line.get("meter") not in (None, IRREGULAR)
+    )
+    if not meters:
+        return IRREGULAR if any(line.get("meter") for line in line_stats or []) else ""
+    return meters.most_common(1)[0][0]
+
+
+def stress_marks(stress: str) -> str:
+    """Display form of a stress code: / for stressed, ˘ for unstressed syllables."""
+    return " ".join("/" if s in "12M" else "˘" for s in stress)
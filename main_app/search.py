@@ -0,0 +1,104 @@
+"""
+Full-text search over piece title, author and text.
+
+Postgres: a tsvector column (Document.search_vector) with a GIN index,
+refreshed whenever a document's text changes.
+SQLite: an FTS5 table (FTS_TABLE) keyed by document id.
+Anything else falls back to unindexed icontains matching on title and
+author (formatted_text is stored compressed, so SQL can't match it).
+"""
+import re
+
+from bs4 import BeautifulSoup
+from django.db import connection
+from django.db.models import Q, TextField, Value
+
+from .models import Document
+
+FTS_TABLE = "main_app_document_fts"
+SEARCH_CONFIG = "english"
+PAGE_SIZE = 20
+
+
+def plain_text(html: str) -> str:
+    return BeautifulSoup(html or "", "html.parser").get_text(separator=" ")
+
+
+def index_document(doc: Document):
+    """Write the document's searchable text to the index."""
+    body = plain_text(doc.formatted_text)
+
+    if connection.vendor == "postgresql":
+        from django.contrib.postgres.search import SearchVector
+
+        def vector(text, weight):
+            return SearchVector(
+                Value(text, output_field=TextField()), weight=weight, config=SEARCH_CONFIG
+            )
+
+        Document.objects.filter(pk=doc.pk).update(
+            search_vector=vector(doc.title, "A") + vector(doc.author, "B") + vector(body, "C")
+        )
+    elif connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [doc.pk])
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, author, body) VALUES (%s, %s, %s, %s)",
+                [doc.pk, doc.title, doc.author, body],
+            )
+
+
+def remove_documents(pks):
+    """Drop deleted documents from the SQLite index (Postgres rows go with the table)."""
+    if connection.vendor == "sqlite" and pks:
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [[pk] for pk in pks])
+
+
+def _fts5_query(query: str) -> str:
+    # Quote each term so user input can't use FTS5 query syntax
+    return " ".join(f'"{term}"' for term in re.findall(r"\w+", query))
+
+
+def search(query: str, page: int = 1, page_size: int = PAGE_SIZE, fields=None):
+    """
+    Best matches first for one page of results, plus whether there's a next page.
+    `fields` limits the loaded columns (like .only()).
+    """
+    offset = (page - 1) * page_size
+    limit = page_size + 1
+    docs = Document.objects.all()
+    if fields:
+        docs = docs.only(*fields)
+
+    if connection.vendor == "postgresql":
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        search_query = SearchQuery(query, search_type="websearch", config=SEARCH_CONFIG)
+        results = list(
+            docs.filter(search_vector=search_query)
+            .annotate(rank=SearchRank("search_vector", search_query))
+            .order_by("-rank", "-id")[offset:offset + limit]
+        )
+    elif connection.vendor == "sqlite":
+        fts_query = _fts5_query(query)
+        if not fts_query:
+            return [], False
+        with connection.cursor() as cursor:
+            # bm25 weights: title, author, body
+            cursor.execute(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+                f"ORDER BY bm25({FTS_TABLE}, 10.0, 5.0, 1.0) LIMIT %s OFFSET %s",
+                [fts_query, limit, offset],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        found = docs.in_bulk(ids)
+        results = [found[pk] for pk in ids if pk in found]
+    else:
+        results = list(
+            docs.filter(
+                Q(title__icontains=query) | Q(author__icontains=query)
+            ).order_by("-created_at", "-id")[offset:offset + limit]
+        )
+
+    return results[:page_size], len(results) > page_size
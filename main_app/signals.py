@@ -0,0 +1,63 @@
+import atexit
+
+from django.core.signals import request_finished
+from django.db import DatabaseError
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import search
+from .models import CacheCounter, Document, MinHashBucket, RhymeEntry
+
+
+def _analysis_saved(instance, created):
+    """
+    Whether this save wrote new analysis fields: it created the row, or
+    follows apply_analysis()/refresh_line_stats() or a reset (a changed source
+    is re-analyzed or reset in Document.save). update_fields can't tell: a
+    save of a row loaded through the default manager (search_vector deferred)
+    arrives with every loaded field listed.
+    """
+    return created or instance.analysis_changed
+
+
+@receiver(post_save, sender=Document)
+def update_search_index(sender, instance, created=False, **kwargs):
+    # Skip saves that leave the title, author and text alone
+    if _analysis_saved(instance, created) or instance.names_changed():
+        search.index_document(instance)
+
+
+@receiver(post_save, sender=Document)
+def update_rhyme_index(sender, instance, created=False, **kwargs):
+    # Entries come from the line stats; other saves leave them alone
+    if _analysis_saved(instance, created):
+        RhymeEntry.index_documents([instance])
+
+
+@receiver(post_save, sender=Document)
+def update_near_duplicate_index(sender, instance, created=False, **kwargs):
+    # Buckets come from the signature, then the piece is checked against earlier ones
+    if _analysis_saved(instance, created):
+        MinHashBucket.index_documents([instance])
+        instance.flag_near_duplicate()
+
+
+@receiver(post_delete, sender=Document)
+def remove_from_search_index(sender, instance, **kwargs):
+    # DocumentQuerySet.bulk_delete() removes its rows' entries in one go
+    if not getattr(instance, "_search_removed", False):
+        search.remove_documents([instance.pk])
+
+
+@receiver(request_finished)
+def flush_cache_counters(sender, **kwargs):
+    # Web workers may sit idle or be recycled; don't hold a request's counts
+    CacheCounter.flush()
+
+
+@atexit.register
+def flush_cache_counters_at_exit():
+    try:
+        CacheCounter.flush()
+    except DatabaseError:
+        pass  # the database may already be gone at shutdown
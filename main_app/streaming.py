@@ -0,0 +1,46 @@
+"""
+Streaming content for StreamingHttpResponse under either handler.
+
+Under ASGI, Django buffers a sync iterator in full before sending any of
+it ("StreamingHttpResponse must consume synchronous iterators..."). An
+async iterator is sent as it is produced. Under WSGI (runserver,
+penm8.wsgi) it is the other way round: an async iterator is collected with
+async_to_sync(list) first. stream_for() hands each handler the kind it
+streams.
+
+aiterate() wraps a sync iterable (a generator over QuerySet.iterator(),
+say) and pulls it a batch at a time through sync_to_async: one thread hop
+per batch, not per chunk, and always on the request's sync thread so
+database cursors stay usable.
+"""
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+STREAM_BATCH_SIZE = 200
+
+
+def is_asgi(request) -> bool:
+    return isinstance(request, ASGIRequest)
+
+
+def stream_for(request, iterable, batch_size=STREAM_BATCH_SIZE):
+    """`iterable` as the content for `request`'s handler: as is for WSGI, through aiterate() for ASGI."""
+    return aiterate(iterable, batch_size) if is_asgi(request) else iterable
+
+
+def _take(iterator, count):
+    return list(islice(iterator, count))
+
+
+async def aiterate(iterable, batch_size=STREAM_BATCH_SIZE):
+    """Async iterator over `iterable`, advanced `batch_size` items at a time in a thread."""
+    iterator = iter(iterable)
+    take = sync_to_async(_take, thread_sensitive=True)
+    while True:
+        batch = await take(iterator, batch_size)
+        if not batch:
+            return
+        for item in batch:
+            yield item
@@ -0,0 +1,222 @@
+"""
+Compact, memory-mapped word -> (min syllables, stress pattern, rhyme) table.
+
+The table is built once from cmudict with `manage.py build_syllable_index`
+and opened lazily on the first lookup. Because it is mmapped read-only,
+every worker process shares the same pages through the OS page cache.
+
+File layout (little-endian):
+  header   MAGIC, version, slot count, entry count
+  slots    slot_count x uint32 offsets into the blob (0 = empty slot),
+           open addressing with linear probing on crc32(word)
+  blob     entries: [word_len u8][word][syllables u8][stress_len u8][stress]
+                    [rhyme_len u8][rhyme]
+           stress is the cmudict stress digits of the shortest pronunciation,
+           rhyme its phonemes from the last stressed vowel on (see rhyme.py)
+
+A file in an older layout is ignored (cmudict is loaded in memory instead)
+until it is rebuilt.
+"""
+import mmap
+import os
+import struct
+import zlib
+from pathlib import Path
+
+MAGIC = b"PSYL"
+VERSION = 2
+HEADER = struct.Struct("<4sHHII")  # magic, version, reserved, slot_count, entry_count
+SLOT = struct.Struct("<I")
+
+DEFAULT_PATH = Path(__file__).resolve().parent.parent / "nltk_data" / "syllables.idx"
+
+
+def index_path() -> Path:
+    return Path(os.environ.get("PENM8_SYLLABLE_INDEX", DEFAULT_PATH))
+
+
+def summarize_pronunciations(prons: list[list[str]]) -> tuple[int, str, str]:
+    """
+    (min syllable count, stress digits, rhyme) of the shortest pronunciation
+    in a cmudict entry.
+    """
+    best = min(prons, key=lambda pron: sum(1 for ph in pron if ph[-1].isdigit()))
+    stress = "".join(ph[-1] for ph in best if ph[-1].isdigit())
+    return len(stress), stress, rhyme_phonemes(best)
+
+
+def rhyme_phonemes(pron: list[str]) -> str:
+    """
+    The phonemes from the last stressed vowel to the end, without stress
+    digits ("T AH0 D EY1" -> "EY"). Words with no stressed vowel rhyme
+    from their last vowel.
+    """
+    vowels = [i for i, ph in enumerate(pron) if ph[-1].isdigit()]
+    if not vowels:
+        return ""
+    stressed = [i for i in vowels if pron[i][-1] in "12"]
+    start = (stressed or vowels)[-1]
+    return " ".join(ph.rstrip("012") for ph in pron[start:])
+
+
+def build_index(pronouncing_dict: dict, path) -> int:
+    """
+    Write the table for a cmudict-style {word: [pronunciations]} mapping.
+    The file is written next to the target and renamed into place, so
+    processes that already mapped the old file keep a consistent view.
+    Returns the number of entries written.
+    """
+    entries = []
+    for word, prons in pronouncing_dict.items():
+        key = word.lower().encode("utf-8")
+        if not prons or len(key) > 255:
+            continue
+        syllables, stress, rhyme = summarize_pronunciations(prons)
+        entries.append((key, syllables, stress.encode("ascii"), rhyme.encode("ascii")))
+
+    slot_count = 1
+    while slot_count < len(entries) * 2:
+        slot_count *= 2
+    mask = slot_count - 1
+
+    slots = [0] * slot_count
+    blob = bytearray(b"\0")  # offset 0 marks an empty slot
+    for key, syllables, stress, rhyme in entries:
+        offset = len(blob)
+        blob += bytes([len(key)]) + key + bytes([syllables, len(stress)]) + stress
+        blob += bytes([len(rhyme)]) + rhyme
+        i = zlib.crc32(key) & mask
+        while slots[i]:
+            i = (i + 1) & mask
+        slots[i] = offset
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, slot_count, len(entries)))
+        f.write(struct.pack(f"<{slot_count}I", *slots))
+        f.write(blob)
+    os.replace(tmp_path, path)
+    return len(entries)
+
+
+class MappedIndex:
+    """Read-only lookups straight out of the mmapped file."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, slot_count, self.entry_count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a syllable index (version {VERSION})")
+        self._mask = slot_count - 1
+        self._blob = HEADER.size + SLOT.size * slot_count
+
+    def _find(self, word: str) -> int:
+        """Offset of the data following the matching key, or -1."""
+        key = word.encode("utf-8")
+        n = len(key)
+        mm = self._mm
+        i = zlib.crc32(key) & self._mask
+        while True:
+            offset = SLOT.unpack_from(mm, HEADER.size + SLOT.size * i)[0]
+            if not offset:
+                return -1
+            start = self._blob + offset
+            if mm[start] == n and mm[start + 1:start + 1 + n] == key:
+                return start + 1 + n
+            i = (i + 1) & self._mask
+
+    def syllables(self, word: str):
+        pos = self._find(word)
+        return self._mm[pos] if pos >= 0 else None
+
+    def stress(self, word: str):
+        pos = self._find(word)
+        if pos < 0:
+            return None
+        length = self._mm[pos + 1]
+        return self._mm[pos + 2:pos + 2 + length].decode("ascii")
+
+    def rhyme(self, word: str):
+        pos = self._find(word)
+        if pos < 0:
+            return None
+        pos += 2 + self._mm[pos + 1]
+        length = self._mm[pos]
+        return self._mm[pos + 1:pos + 1 + length].decode("ascii")
+
+
+class DictIndex:
+    """In-memory fallback when the mmapped table hasn't been built."""
+
+    def __init__(self, pronouncing_dict: dict):
+        self._entries = {
+            word.lower(): summarize_pronunciations(prons)
+            for word, prons in pronouncing_dict.items()
+            if prons
+        }
+        self.entry_count = len(self._entries)
+
+    def syllables(self, word: str):
+        entry = self._entries.get(word)
+        return entry[0] if entry else None
+
+    def stress(self, word: str):
+        entry = self._entries.get(word)
+        return entry[1] if entry else None
+
+    def rhyme(self, word: str):
+        entry = self._entries.get(word)
+        return entry[2] if entry else None
+
+
+def load_cmudict():
+    """cmudict from the NLTK data path, or None if it isn't installed."""
+    import nltk
+
+    try:
+        from nltk.corpus import cmudict
+
+        nltk.data.find("corpora/cmudict")
+        return cmudict.dict()
+    except LookupError:
+        return None
+
+
+_index = None
+
+
+def get_index():
+    """The shared index, opened on first use (None if no dictionary is available)."""
+    global _index
+    if _index is None:
+        path = index_path()
+        if path.exists():
+            try:
+                _index = MappedIndex(path)
+            except ValueError:
+                _index = None  # older layout: rebuild with build_syllable_index
+        if _index is None:
+            pronouncing_dict = load_cmudict()
+            _index = DictIndex(pronouncing_dict) if pronouncing_dict else False
+    return _index or None
+
+
+def syllables(word: str):
+    """Min syllable count for a lowercased word, or None if it isn't in cmudict."""
+    index = get_index()
+    return index.syllables(word) if index else None
+
+
+def stress(word: str):
+    """Stress digits ("0", "1", "2" per syllable) for a lowercased word, or None."""
+    index = get_index()
+    return index.stress(word) if index else None
+
+
+def rhyme(word: str):
+    """Rhyme phonemes (see rhyme_phonemes) for a lowercased word, or None."""
+    index = get_index()
+    return index.rhyme(word) if index else None
@@ -0,0 +1,11 @@
+from django import template
+
+from main_app.scansion import stress_marks as _stress_marks
+
+register = template.Library()
+
+
+@register.filter
+def stress_marks(stress):
+    """Render a stored stress code as / and ˘ marks."""
+    return _stress_marks(stress or "")
@@ -0,0 +1,17 @@
+from main_app.models import Document
+
+SONNET = (
+    "<p>Shall I compare thee to a summer's day?</p>"
+    "<p>Thou art more lovely and more temperate:</p>"
+    "<p>Rough winds do shake the darling buds of May,</p>"
+    "<p>And summer's lease hath all too short a date;</p>"
+)
+
+
+def analyzed_document(title="Sonnet", author="Shakespeare", html=SONNET, **fields):
+    """A saved, analyzed document from pasted HTML (no job queue involved)."""
+    doc = Document.objects.create(title=title, author=author, formatted_text=html, **fields)
+    doc.analyze()
+    doc.status = Document.STATUS_DONE
+    doc.save()
+    return doc
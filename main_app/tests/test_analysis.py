@@ -0,0 +1,69 @@
+import numpy as np
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from main_app.heatmap import _group_percentiles, corpus_heatmap
+from main_app.models import AnalysisCacheEntry, CacheCounter, Document
+from main_app.signals import flush_cache_counters_at_exit
+from main_app.utils import analyze_html, hash_html, process_html_perline
+
+
+class HtmlHashTests(TestCase):
+    def test_whitespace_changes_the_hash(self):
+        # The analyzer counts whitespace, so the cache key must too
+        spaced, broken = "<p>violets   are blue</p>", "<p>violets\nare blue</p>"
+        self.assertNotEqual(analyze_html(spaced)[0], analyze_html(broken)[0])
+        self.assertNotEqual(hash_html(spaced), hash_html(broken))
+        self.assertEqual(hash_html(spaced), hash_html(spaced))
+
+    def test_cached_analysis_is_not_shared_across_whitespace(self):
+        first = Document.objects.create(title="One", author="A", formatted_text="<p>violets   are blue</p>")
+        first.analyze()
+        second = Document.objects.create(title="Two", author="A", formatted_text="<p>violets\nare blue</p>")
+        second.analyze()
+        self.assertEqual(AnalysisCacheEntry.objects.count(), 2)
+        self.assertNotEqual(first.char_count, second.char_count)
+
+
+class HeatmapTests(TestCase):
+    def test_group_percentiles_without_values(self):
+        result = _group_percentiles(np.array([]), np.array([], dtype=np.int64), np.array([0, 0]), (10, 90))
+        self.assertEqual([list(result["p10"]), list(result["p90"])], [[0, 0], [0, 0]])
+
+    def test_corpus_heatmap_of_blank_pieces(self):
+        data = corpus_heatmap([("blank", "Blank", "Z", b"\xff\xff" * 6)])
+        self.assertEqual(data["pieces"][0]["p50"], 0.0)
+
+
+class PerLineTests(TestCase):
+    def test_html_lines_match_the_full_analysis(self):
+        html = (
+            "<p>Shall I <b>compare</b> thee to a summer's day?</p><p>&nbsp;</p>"
+            "<p><i>Thou art</i> more lovely and more temperate:</p><p></p>"
+        )
+        self.assertEqual(process_html_perline(html), analyze_html(html)[1])
+
+
+@override_settings(CACHE_COUNTER_FLUSH_SECONDS=3600)
+class CacheCounterTests(TestCase):
+    def value(self, name):
+        return CacheCounter.objects.filter(name=name).values_list("value", flat=True).first() or 0
+
+    def test_increments_are_buffered_until_flushed(self):
+        CacheCounter.increment("test.hits", 2)
+        CacheCounter.increment("test.hits")
+        self.assertEqual(self.value("test.hits"), 0)
+        CacheCounter.flush()
+        self.assertEqual(self.value("test.hits"), 3)
+
+    def test_written_when_a_request_finishes(self):
+        # A lookup made during the request is written without waiting for another
+        AnalysisCacheEntry.lookup_many(["not-cached"])
+        before = self.value("analysis_cache.misses")
+        self.client.get(reverse("home"))
+        self.assertEqual(self.value("analysis_cache.misses"), before + 1)
+
+    def test_written_at_exit(self):
+        CacheCounter.increment("test.exits")
+        flush_cache_counters_at_exit()
+        self.assertEqual(self.value("test.exits"), 1)
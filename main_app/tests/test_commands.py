@@ -0,0 +1,40 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from main_app import search
+from main_app.models import AuthorStats, Document, RhymeEntry
+
+from .helpers import analyzed_document
+
+
+def search_index_rows():
+    if connection.vendor != "sqlite":
+        return None  # Postgres keeps the vector on the row itself
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT rowid FROM {search.FTS_TABLE} ORDER BY rowid")
+        return [row[0] for row in cursor.fetchall()]
+
+
+class ClearDocumentsTests(TestCase):
+    def setUp(self):
+        self.cleared = [analyzed_document(title=f"Cleared {i}", author="Gone") for i in range(5)]
+        self.kept = analyzed_document(title="Kept", author="Stays")
+
+    def test_clears_rows_indexes_and_aggregates(self):
+        call_command("clear_documents", author=["Gone"], batch_size=2, stdout=StringIO())
+
+        self.assertEqual(list(Document.objects.values_list("pk", flat=True)), [self.kept.pk])
+        self.assertFalse(RhymeEntry.objects.exclude(document=self.kept).exists())
+        self.assertFalse(AuthorStats.objects.filter(author="Gone").exists())
+        if connection.vendor == "sqlite":
+            self.assertEqual(search_index_rows(), [self.kept.pk])
+
+    def test_ordinary_deletes_still_clean_the_index(self):
+        call_command("clear_documents", author=["Gone"], stdout=StringIO())
+        # The post_delete receiver is never switched off
+        self.kept.delete()
+        if connection.vendor == "sqlite":
+            self.assertEqual(search_index_rows(), [])
@@ -0,0 +1,60 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from main_app import jobs
+from main_app.models import AnalysisJob, Document
+
+from .helpers import SONNET
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        self.doc = Document.objects.create(title="Queued", author="A", formatted_text=SONNET)
+        self.job = jobs.enqueue_analysis(self.doc)
+
+    def test_enqueue_marks_pending(self):
+        self.doc.refresh_from_db()
+        self.assertEqual(self.doc.status, Document.STATUS_PENDING)
+        self.assertEqual(self.job.status, AnalysisJob.QUEUED)
+
+    def test_claim_once(self):
+        job = jobs.claim_next_job("worker-1")
+        self.assertEqual(job.pk, self.job.pk)
+        self.assertEqual((job.status, job.locked_by, job.attempts), (AnalysisJob.RUNNING, "worker-1", 1))
+        self.assertIsNone(jobs.claim_next_job("worker-2"))
+
+    def test_claim_skips_backed_off_jobs(self):
+        AnalysisJob.objects.update(run_after=timezone.now() + timedelta(minutes=5))
+        self.assertIsNone(jobs.claim_next_job("worker-1"))
+
+    def test_run_job(self):
+        self.assertTrue(jobs.run_job(jobs.claim_next_job("worker-1")))
+        self.doc.refresh_from_db()
+        self.job.refresh_from_db()
+        self.assertEqual(self.doc.status, Document.STATUS_DONE)
+        self.assertEqual(self.doc.line_count, 4)
+        self.assertEqual(self.job.status, AnalysisJob.DONE)
+
+    def test_expired_lease_is_requeued(self):
+        jobs.claim_next_job("crashed")
+        # Inside the lease nothing moves
+        self.assertEqual(jobs.requeue_stale_jobs(600), 0)
+
+        AnalysisJob.objects.update(locked_at=timezone.now() - timedelta(seconds=601))
+        self.assertEqual(jobs.requeue_stale_jobs(600), 1)
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.status, self.job.locked_by), (AnalysisJob.QUEUED, ""))
+        self.assertEqual(jobs.claim_next_job("worker-2").attempts, 2)
+
+    def test_expired_lease_out_of_attempts_fails(self):
+        jobs.claim_next_job("crashed")
+        AnalysisJob.objects.update(
+            attempts=3, max_attempts=3, locked_at=timezone.now() - timedelta(seconds=601)
+        )
+        self.assertEqual(jobs.requeue_stale_jobs(600), 0)
+        self.job.refresh_from_db()
+        self.doc.refresh_from_db()
+        self.assertEqual(self.job.status, AnalysisJob.FAILED)
+        self.assertEqual(self.doc.status, Document.STATUS_FAILED)
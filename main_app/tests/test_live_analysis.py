@@ -0,0 +1,47 @@
+import json
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase
+from django.urls import reverse
+
+from main_app.utils import analyze_html
+
+PARAGRAPHS = {
+    "a": "<p>Shall I compare thee to a summer's day?</p>",
+    "b": "<p>Thou art more lovely and more temperate.</p>",
+    "c": "<p>Rough winds do shake the darling buds of May.</p>",
+}
+
+
+class LiveAnalysisTests(TestCase):
+    def post(self, order, paragraphs):
+        response = self.client.post(
+            reverse("live_analysis_json"),
+            json.dumps({"order": order, "paragraphs": paragraphs}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_cache_is_shared_between_processes(self):
+        # Each worker process would have its own LocMem cache
+        self.assertNotIsInstance(caches["live_analysis"], LocMemCache)
+
+    def test_only_new_paragraphs_are_sent(self):
+        data = self.post(["a", "b"], {"a": PARAGRAPHS["a"], "b": PARAGRAPHS["b"]})
+        self.assertEqual(set(data["lines"]), {"a", "b"})
+
+        # Reordered, plus one new paragraph: only that one is analyzed
+        data = self.post(["b", "c", "a"], {"c": PARAGRAPHS["c"]})
+        self.assertEqual((set(data["lines"]), data["missing"]), ({"c"}, []))
+        expected = analyze_html(PARAGRAPHS["b"] + PARAGRAPHS["c"] + PARAGRAPHS["a"])[0][1:]
+        self.assertEqual(tuple(data["totals"].values()), tuple(expected))
+        self.assertEqual(self.client.session["live_analysis"], ["b", "c", "a"])
+
+    def test_lost_entries_are_reported_missing(self):
+        self.post(["a"], {"a": PARAGRAPHS["a"]})
+        caches["live_analysis"].clear()
+        data = self.post(["a"], {})
+        self.assertEqual(data["missing"], ["a"])
+        self.assertNotIn("totals", data)
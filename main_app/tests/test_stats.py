@@ -0,0 +1,45 @@
+from django.test import TestCase
+
+from main_app.models import COUNT_FIELDS, AuthorStats, CorpusStats, Document
+
+from .helpers import analyzed_document
+
+
+def totals(stats):
+    return [stats.documents, *(getattr(stats, field) for field in COUNT_FIELDS)]
+
+
+class RecordChangeTests(TestCase):
+    def test_deltas(self):
+        AuthorStats.record_change(None, ("A", [1, 10, 50, 2, 4, 1, 12]))
+        AuthorStats.record_change(None, ("A", [1, 5, 20, 1, 2, 1, 6]))
+        self.assertEqual(totals(AuthorStats.objects.get(author="A")), [2, 15, 70, 3, 6, 2, 18])
+
+        # Moving a document between authors takes its counts along
+        AuthorStats.record_change(("A", [1, 5, 20, 1, 2, 1, 6]), ("B", [1, 5, 20, 1, 2, 1, 6]))
+        self.assertEqual(totals(AuthorStats.objects.get(author="A")), [1, 10, 50, 2, 4, 1, 12])
+        self.assertEqual(totals(AuthorStats.objects.get(author="B")), [1, 5, 20, 1, 2, 1, 6])
+        self.assertEqual(totals(CorpusStats.current()), [2, 15, 70, 3, 6, 2, 18])
+
+        # An author's row goes with their last document
+        AuthorStats.record_change(("B", [1, 5, 20, 1, 2, 1, 6]), None)
+        self.assertFalse(AuthorStats.objects.filter(author="B").exists())
+        self.assertEqual(totals(CorpusStats.current()), [1, 10, 50, 2, 4, 1, 12])
+
+
+class DocumentStatsTests(TestCase):
+    def test_save_and_delete_keep_aggregates_current(self):
+        doc = analyzed_document(author="A")
+        other = analyzed_document(author="A", title="Other")
+        stats = AuthorStats.objects.get(author="A")
+        self.assertEqual(stats.documents, 2)
+        self.assertEqual(stats.word_count, doc.word_count + other.word_count)
+
+        doc.author = "B"
+        doc.save()
+        self.assertEqual(AuthorStats.objects.get(author="A").word_count, other.word_count)
+        self.assertEqual(AuthorStats.objects.get(author="B").word_count, doc.word_count)
+
+        Document.objects.filter(pk=other.pk).delete()
+        self.assertFalse(AuthorStats.objects.filter(author="A").exists())
+        self.assertEqual(totals(CorpusStats.current()), totals(AuthorStats.objects.get(author="B")))
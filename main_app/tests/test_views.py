@@ -0,0 +1,119 @@
+import json
+
+from django.contrib.auth.models import User
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import reverse
+
+from main_app.models import Document
+
+from .helpers import analyzed_document
+
+
+class AnalysisJsonTests(TestCase):
+    def setUp(self):
+        self.doc = analyzed_document()
+        self.url = reverse("document_analysis_json", kwargs={"slug": self.doc.slug})
+
+    def test_etag_and_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        data = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(len(data["lines"]), self.doc.line_count)
+
+        response = self.client.get(self.url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        # Any save moves updated_at, which versions the ETag
+        self.doc.title = "Renamed"
+        self.doc.save()
+        response = self.client.get(self.url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_streams_sync_content_under_wsgi(self):
+        # An async iterator would be buffered whole by the WSGI handler
+        for url in (self.url, reverse("export_stats") + "?shape=lines"):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertFalse(response.is_async)
+                self.assertTrue(b"".join(response.streaming_content))
+
+
+class AsyncStreamingTests(TestCase):
+    async def test_streams_async_content_under_asgi(self):
+        doc = await Document.objects.acreate(title="t", author="a", formatted_text="<p>x</p>", line_stats=[])
+        client = AsyncClient()
+        for url in (
+            reverse("document_analysis_json", kwargs={"slug": doc.slug}),
+            reverse("export_stats") + "?format=jsonl",
+        ):
+            with self.subTest(url=url):
+                response = await client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.is_async)
+                self.assertTrue(b"".join([chunk async for chunk in response.streaming_content]))
+
+
+class StatsDashboardTests(TestCase):
+    def test_awkward_author_names(self):
+        for author in ("A/B", "", "What? #1 100%"):
+            analyzed_document(title=f"By {author or 'nobody'}", author=author)
+
+        response = self.client.get(reverse("stats"))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "No author")
+        for author in ("A/B", "What? #1 100%"):
+            with self.subTest(author=author):
+                page = self.client.get(reverse("author_stats", kwargs={"author": author}))
+                self.assertEqual(page.status_code, 200)
+                self.assertEqual(page.context["stats"].author, author)
+
+
+class CorpusHeatmapTests(TestCase):
+    def test_all_blank_pieces(self):
+        Document.objects.create(
+            title="Blank", author="Z", formatted_text="<p></p>",
+            status=Document.STATUS_DONE, line_metrics=b"\xff\xff" * 6,
+        )
+        for params in ({}, {"author": "Z"}, {"author": ""}):
+            with self.subTest(params=params):
+                response = self.client.get(reverse("corpus_heatmap_json"), params)
+                self.assertEqual(response.status_code, 200)
+        piece = self.client.get(reverse("corpus_heatmap_json")).json()["pieces"][0]
+        self.assertEqual((piece["lines"], piece["p10"], piece["p90"]), (0, 0.0, 0.0))
+
+    def test_paged(self):
+        for i in range(5):
+            analyzed_document(title=f"Piece {i}")
+        url, seen = reverse("corpus_heatmap_json") + "?limit=2&author=Shakespeare", []
+        while url:
+            data = self.client.get(url).json()
+            self.assertLessEqual(len(data["pieces"]), 2)
+            seen.extend(piece["slug"] for piece in data["pieces"])
+            url = data["next"]
+        self.assertEqual(len(set(seen)), 5)
+
+
+class MetricsAccessTests(TestCase):
+    url = "/metrics/"
+
+    def test_local_address_is_not_enough(self):
+        self.assertEqual(self.client.get(self.url, REMOTE_ADDR="127.0.0.1").status_code, 403)
+
+    @override_settings(METRICS_TOKEN="s3cret")
+    def test_token(self):
+        self.assertEqual(self.client.get(self.url, headers={"authorization": "Bearer s3cret"}).status_code, 200)
+        self.assertEqual(self.client.get(self.url, headers={"authorization": "Bearer nope"}).status_code, 403)
+
+    def test_empty_token_never_matches(self):
+        self.assertEqual(self.client.get(self.url, headers={"authorization": "Bearer "}).status_code, 403)
+
+    def test_staff(self):
+        user = User.objects.create_user("staffer", is_staff=True)
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        user.is_staff = False
+        user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 403)
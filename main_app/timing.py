@@ -0,0 +1,156 @@
+"""
+Per-stage timing and counters for the analysis pipeline and the views.
+
+    with timing.stage("html.parse"):
+        soup = BeautifulSoup(...)
+
+Each finished stage is observed in an in-process histogram and, inside a
+request (see ServerTimingMiddleware), added to that request's stage totals,
+which end up in its Server-Timing header. Stages may nest; each is timed on
+its own. render_metrics() gives everything in Prometheus text format.
+
+When disabled (the default), stage() returns one shared no-op context
+manager and counters are skipped at the call site with `if timing.ENABLED`,
+so the hooks cost a function call per stage. Enable with
+configure(enabled=True) (TIMING_ENABLED in the Django settings) or
+PENM8_TIMING=1 for scripts. Metrics are per process: analysis done by
+analysis_worker shows up in the worker, not the web server.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+ENABLED = os.environ.get("PENM8_TIMING") == "1"
+
+# Histogram bucket upper bounds, in milliseconds
+BUCKETS_MS = (0.1, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_NOOP = nullcontext()
+_lock = threading.Lock()
+_histograms = {}  # stage -> [bucket counts..., +Inf count, sum_ms]
+_counters = Counter()
+_request_stages = ContextVar("request_stages", default=None)
+
+
+def configure(enabled: bool):
+    global ENABLED
+    ENABLED = enabled
+
+
+def observe(name: str, ms: float):
+    """Record one finished stage."""
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = [0] * (len(BUCKETS_MS) + 2)
+        histogram[bisect_left(BUCKETS_MS, ms)] += 1
+        histogram[-1] += ms
+
+    stages = _request_stages.get()
+    if stages is not None:
+        stages[name] = stages.get(name, 0.0) + ms
+
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+def stage(name: str):
+    """Context manager timing one stage (a no-op while disabled)."""
+    if not ENABLED:
+        return _NOOP
+    return _Stage(name)
+
+
+def timed_iter(name: str, iterable):
+    """
+    `iterable`, with the time spent producing its items observed as one
+    stage once it's exhausted (the iterable itself while disabled).
+    """
+    if not ENABLED:
+        return iterable
+    return _timed_iter(name, iter(iterable))
+
+
+def _timed_iter(name, iterator):
+    total = 0.0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                total += time.perf_counter() - start
+                return
+            total += time.perf_counter() - start
+            yield item
+    finally:
+        observe(name, total * 1000)
+
+
+def count(name: str, by: int = 1):
+    """Increment a counter. Callers on hot paths check ENABLED first."""
+    with _lock:
+        _counters[name] += by
+
+
+@contextmanager
+def collect():
+    """Gather the stages finished inside the block: yields {stage: total ms}."""
+    stages = {}
+    token = _request_stages.set(stages)
+    try:
+        yield stages
+    finally:
+        _request_stages.reset(token)
+
+
+def server_timing(stages: dict) -> str:
+    """A Server-Timing header value for {stage: ms}."""
+    return ", ".join(f"{name.replace('.', '-')};dur={ms:.2f}" for name, ms in stages.items())
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def render_metrics() -> str:
+    """Histograms and counters in Prometheus text exposition format."""
+    with _lock:
+        histograms = {name: list(values) for name, values in _histograms.items()}
+        counters = dict(_counters)
+
+    lines = [
+        "# HELP penm8_stage_ms Time spent per stage in milliseconds.",
+        "# TYPE penm8_stage_ms histogram",
+    ]
+    for name in sorted(histograms):
+        values = histograms[name]
+        cumulative = 0
+        for bound, hits in zip((*BUCKETS_MS, "+Inf"), values[:-1]):
+            cumulative += hits
+            lines.append(f'penm8_stage_ms_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+        lines.append(f'penm8_stage_ms_sum{{stage="{name}"}} {values[-1]:.3f}')
+        lines.append(f'penm8_stage_ms_count{{stage="{name}"}} {cumulative}')
+
+    lines += ["# HELP penm8_events_total Event counters.", "# TYPE penm8_events_total counter"]
+    for name in sorted(counters):
+        lines.append(f'penm8_events_total{{event="{name}"}} {counters[name]}')
+    return "\n".join(lines) + "\n"
@@ -5,5 +5,20 @@ urlpatterns = [
     path("", views.home, name="home"),
     path("uploader/", views.uploader, name="uploader"),
     path("pieces/", views.pieces_index, name="index"),
-    path("pieces/<slug:slug>/", views.document_detail, name="document_detail"), 
+    path("pieces/<slug:slug>/", views.document_detail, name="document_detail"),
+    path("pieces/<slug:slug>/status/", views.document_status, name="document_status"),
+    path("search/", views.search_pieces, name="search"),
+    path("stats/", views.stats_dashboard, name="stats"),
+    # path: author names may contain "/" (reverse() quotes the rest)
+    path("stats/authors/<path:author>/", views.author_stats, name="author_stats"),
+    path("api/pieces/", views.pieces_index_json, name="pieces_index_json"),
+    path("api/search/", views.search_pieces_json, name="search_json"),
+    path("api/pieces/batch/", views.document_analysis_batch_json, name="document_analysis_batch_json"),
+    path("api/pieces/<slug:slug>/", views.document_analysis_json, name="document_analysis_json"),
+    path("api/pieces/<slug:slug>/heatmap/", views.piece_heatmap_json, name="piece_heatmap_json"),
+    path("api/live-analysis/", views.live_analysis_json, name="live_analysis_json"),
+    path("api/heatmap/", views.corpus_heatmap_json, name="corpus_heatmap_json"),
+    path("api/export/", views.export_stats, name="export_stats"),
+    path("api/rhymes/", views.rhymes_json, name="rhymes_json"),
+    path("metrics/", views.metrics, name="metrics"),
 ]
\ No newline at end of file
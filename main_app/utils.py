@@ -1,24 +1,72 @@
-from docx import Document
 from bs4 import BeautifulSoup
+from collections import Counter
+from functools import lru_cache
+from typing import NamedTuple
+import hashlib
 import re
-import nltk
 
-try:
-    from nltk.corpus import cmudict
-    nltk.data.find("corpora/cmudict")
-    cmu_dict = cmudict.dict()
-except LookupError:
-    cmu_dict = None
+from . import rhyme, scansion, syllable_index, timing
+from .docx_stream import iter_paragraphs
+
+# Bump whenever analysis output changes, so cached results are recomputed
+ANALYZER_VERSION = 4
+
+# Distinct lowercased words whose syllable counts are memoized (LRU-evicted)
+SYLLABLE_MEMO_SIZE = 65536
+
+
+def hash_docx(file_path: str) -> str:
+    """sha256 of the file bytes."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_html(html: str) -> str:
+    """sha256 of the exact HTML (whitespace changes the lines and counts)."""
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
 
 
 def count_syllables_in_word(word: str) -> int:
-    word = word.lower()
-    if cmu_dict and word in cmu_dict:
-        # cmudict can give multiple pronunciations; take min syllable count
-        return min(
-            [len([ph for ph in pron if ph[-1].isdigit()]) for pron in cmu_dict[word]]
-        )
+    return _word_syllables(word.lower())
+
+
+class SyllableCounts(NamedTuple):
+    per_token: list
+    total: int
+
+
+def count_syllables(tokens) -> SyllableCounts:
+    """
+    Syllable counts for a stream of tokens, in order, plus their total.
+    Each distinct token is counted once, so repeated words ("the", "and")
+    cost a dict lookup; counts are also memoized across calls.
+    """
+    tokens = list(tokens)
+    frequencies = Counter(tokens)
+    counts = {token: _word_syllables(token.lower()) for token in frequencies}
+    if timing.ENABLED:
+        timing.count("syllables.tokens", len(tokens))
+    return SyllableCounts(
+        [counts[token] for token in tokens],
+        sum(counts[token] * n for token, n in frequencies.items()),
+    )
+
+
+@lru_cache(maxsize=SYLLABLE_MEMO_SIZE)
+def _word_syllables(word: str) -> int:
+    """Syllables in a lowercased word (the cmudict/fallback counters count memo misses)."""
+    # Precomputed min syllable count over cmudict pronunciations
+    syllables = syllable_index.syllables(word)
+    if syllables is not None:
+        if timing.ENABLED:
+            timing.count("syllables.cmudict")
+        return syllables
     else:
+        if timing.ENABLED:
+            timing.count("syllables.fallback")
         # Fallback heuristic
         word = re.sub(r"[^a-z]", "", word)
         if not word:
@@ -39,146 +87,311 @@ def count_syllables_in_word(word: str) -> int:
         return max(1, count)
 
 
-def process_docx(file_path: str) -> tuple[str, int, int, int, int, int, int]:
+ALIGN_MAP = {
+    0: "left",
+    1: "center",
+    2: "right",
+    3: "justify",
+}
+
+WORD_RE = re.compile(r"\b\w+\b")
+SENTENCE_SPLIT_RE = re.compile(r"[.!?]+(?:\s|$)")
+
+BLANK_LINE = {"text": "&nbsp;", "words": -1, "syllables": -1}
+
+
+def _document_counts(plain_text: str, paragraph_count: int) -> tuple[int, int, int, int, int, int]:
     """
-    Read DOCX with python-docx, convert to HTML preserving:
-    - Paragraph alignment
-    - Inline styles (bold, italic, underline)
-    - Multiple spaces/tabs
-    - Blank lines (as <br> or empty <p>)
+    Document totals from the plain text (text nodes joined by newlines).
     Returns:
-      (html_content, word_count, char_count, sentence_count, line_count, paragraph_count, syllable_count)
+      (word_count, char_count, sentence_count, line_count, paragraph_count, syllable_count)
     """
-    doc = Document(file_path)
+    # Word & char counts
+    words = plain_text.split()
+    word_count = len(words)
+    clean_text = plain_text.replace("\n", "").replace("\t", "")
+    char_count = len(clean_text)
 
-    html_parts = []
-    align_map = {
-        0: "left",
-        1: "center",
-        2: "right",
-        3: "justify",
+    # Sentence count
+    with timing.stage("counts.sentences"):
+        sentences = SENTENCE_SPLIT_RE.split(plain_text.strip())
+        sentence_count = len([s for s in sentences if s.strip()])
+
+    # Line count (based on newlines in plain text)
+    line_count = len([line for line in plain_text.splitlines() if line.strip()])
+
+    # Syllable count (total doc)
+    with timing.stage("counts.syllables"):
+        syllable_count = count_syllables(words).total
+
+    return (
+        word_count,
+        char_count,
+        sentence_count,
+        line_count,
+        paragraph_count,
+        syllable_count,
+    )
+
+
+def _line_record(raw_html: str, raw_text: str) -> dict:
+    """
+    Per-line stats: words/syllables/scansion/rhyme come from the raw text,
+    display from the HTML. "stress" is the compact code described in
+    scansion.py, "rhyme" the line's rhyme key (see rhyme.py).
+    """
+    words = WORD_RE.findall(raw_text)
+    with timing.stage("line.syllables"):
+        syllables = count_syllables(words).total
+    with timing.stage("line.scansion"):
+        stress, meter = scansion.scan_line(raw_text)
+    return {
+        "text": raw_html,
+        "words": len(words),
+        "syllables": syllables,
+        "stress": stress,
+        "meter": meter,
+        "rhyme": rhyme.line_rhyme_key(raw_text),
     }
 
-    for para in doc.paragraphs:
-        if not para.text.strip():
+
+def readability(word_count: int, sentence_count: int, line_count: int,
+                syllable_count: int) -> tuple[float, float, float]:
+    """
+    Derived metrics from the document totals, rounded to 2 places:
+      (flesch_reading_ease, syllables_per_word, syllables_per_line)
+    Text without sentence punctuation counts as one sentence.
+    """
+    if not word_count:
+        return 0.0, 0.0, 0.0
+    syllables_per_word = syllable_count / word_count
+    words_per_sentence = word_count / max(1, sentence_count)
+    flesch = 206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word
+    syllables_per_line = syllable_count / line_count if line_count else 0.0
+    return round(flesch, 2), round(syllables_per_word, 2), round(syllables_per_line, 2)
+
+
+def analyze_docx(file_path: str) -> tuple[tuple[str, int, int, int, int, int, int], list[dict]]:
+    """
+    Single pass over the DOCX paragraphs producing everything we store:
+    - the document HTML (alignment, bold/italic/underline, spaces/tabs, blank lines)
+    - the document totals
+    - the per-line records
+    Paragraphs are streamed from the file (see docx_stream), so the document
+    tree is never held in memory. The plain text is collected while building
+    the HTML, split into the same text nodes BeautifulSoup would find in it,
+    so nothing is re-parsed.
+    Returns:
+      ((html_content, word_count, char_count, sentence_count, line_count,
+        paragraph_count, syllable_count), line_stats)
+    """
+    with timing.stage("analyze.docx"):
+        return _analyze_docx(file_path)
+
+
+def _analyze_docx(file_path: str):
+    html_parts = []
+    text_nodes = []
+    line_stats = []
+
+    # docx.load: reading the XML; the rest of the loop builds the HTML
+    for para in timing.timed_iter("docx.load", iter_paragraphs(file_path)):
+        para_text = para.text
+        if not para_text.strip():
             # Preserve blank lines
             html_parts.append("<p><br></p>")
+            line_stats.append(dict(BLANK_LINE))
             continue
 
         # Paragraph alignment
-        align = align_map.get(para.paragraph_format.alignment, "left")
-        para_html = f'<p style="text-align:{align}; white-space: pre-wrap;">'
+        align = ALIGN_MAP.get(para.alignment, "left")
 
-        # Inline runs
+        run_parts = []
+        pending = ""  # unformatted text that will merge into a single text node
         for run in para.runs:
+            raw = run.text
+            if not raw:
+                continue
+
             # Preserve line breaks *inside runs*
-            text = run.text.replace("\n", "<br>")
+            text = raw.replace("\n", "<br>")
 
             # Preserve multiple spaces & tabs
             text = text.replace("  ", "&nbsp;&nbsp;")   # double spaces
             text = text.replace("\t", "&nbsp;&nbsp;&nbsp;&nbsp;")  # tabs
 
-            if not text:
-                continue
+            # The same text as the parser would read it back (&nbsp; -> \xa0)
+            pieces = (
+                raw.replace("  ", "\xa0\xa0")
+                .replace("\t", "\xa0\xa0\xa0\xa0")
+                .split("\n")
+            )
+
+            if run.bold or run.italic or run.underline:
+                if pending:
+                    text_nodes.append(pending)
+                    pending = ""
+                text_nodes.extend(piece for piece in pieces if piece)
+
+                if run.bold:
+                    text = f"<b>{text}</b>"
+                if run.italic:
+                    text = f"<i>{text}</i>"
+                if run.underline:
+                    text = f"<u>{text}</u>"
+            else:
+                pending += pieces[0]
+                for piece in pieces[1:]:
+                    if pending:
+                        text_nodes.append(pending)
+                    pending = piece
 
-            if run.bold:
-                text = f"<b>{text}</b>"
-            if run.italic:
-                text = f"<i>{text}</i>"
-            if run.underline:
-                text = f"<u>{text}</u>"
+            run_parts.append(text)
 
-            para_html += text
+        if pending:
+            text_nodes.append(pending)
 
-        para_html += "</p>"
-        html_parts.append(para_html)
+        runs_html = "".join(run_parts)
+        html_parts.append(
+            f'<p style="text-align:{align}; white-space: pre-wrap;">{runs_html}</p>'
+        )
+        line_stats.append(_line_record(runs_html.strip(), para_text.strip()))
 
     # Final HTML
     html_content = "".join(html_parts)
 
-    # Plain text for analysis
-    soup = BeautifulSoup(html_content, "html.parser")
-    plain_text = soup.get_text(separator="\n")  # keep line breaks for counting
+    # Plain text for analysis, keeping line breaks for counting
+    plain_text = "\n".join(text_nodes)
+    counts = _document_counts(plain_text, paragraph_count=len(html_parts))
 
-    # Word & char counts
-    words = plain_text.split()
-    word_count = len(words)
-    clean_text = plain_text.replace("\n", "").replace("\t", "")
-    char_count = len(clean_text)
-
-    # Sentence count
-    sentences = re.split(r"[.!?]+(?:\s|$)", plain_text.strip())
-    sentence_count = len([s for s in sentences if s.strip()])
-
-    # Line count (based on newlines in plain text)
-    line_count = len([line for line in plain_text.splitlines() if line.strip()])
-
-    # Paragraph count (based on <p> tags we generated)
-    paragraph_count = len(soup.find_all("p"))
+    return (html_content, *counts), line_stats
 
-    # Syllable count (total doc)
-    syllable_count = sum(count_syllables_in_word(w) for w in words)
 
-    return (
-        html_content,
-        word_count,
-        char_count,
-        sentence_count,
-        line_count,
-        paragraph_count,
-        syllable_count,
-    )
-
-def process_html(html: str) -> tuple[str, int, int, int, int, int, int]:
+def analyze_html(html: str) -> tuple[tuple[str, int, int, int, int, int, int], list[dict]]:
     """
-    Analyze already-formatted HTML (from CKEditor).
+    Analyze already-formatted HTML (from CKEditor) with a single parse.
     Returns:
-      (html_content, word_count, char_count, sentence_count,
-       line_count, paragraph_count, syllable_count)
+      ((html_content, word_count, char_count, sentence_count, line_count,
+        paragraph_count, syllable_count), line_stats)
     """
+    with timing.stage("analyze.html"):
+        return _analyze_html(html)
+
+
+def _analyze_html(html: str):
     # Ensure valid HTML
-    soup = BeautifulSoup(html, "html.parser")
+    with timing.stage("html.parse"):
+        soup = BeautifulSoup(html, "html.parser")
 
     # Cleaned HTML (preserve inline tags, normalize whitespace)
-    html_content = str(soup)
+    with timing.stage("html.serialize"):
+        html_content = str(soup)
 
     # Extract plain text
+    with timing.stage("html.text"):
+        plain_text = soup.get_text(separator="\n")
+
+    paragraphs = soup.find_all("p")
+    line_stats = _paragraph_lines(paragraphs)
+    counts = _document_counts(plain_text, paragraph_count=len(paragraphs))
+
+    return (html_content, *counts), line_stats
+
+
+def _paragraph_lines(paragraphs) -> list[dict]:
+    """Per-line records for parsed <p> elements."""
+    lines = []
+    for p in paragraphs:
+        # Get the inner HTML of the <p> instead of plain text
+        raw_html = "".join(str(c) for c in p.contents).strip()
+        raw_text = p.get_text().strip()
+
+        if raw_text == "":
+            # Preserve blank lines visually with &nbsp;
+            lines.append(dict(BLANK_LINE))
+            continue
+
+        lines.append(_line_record(raw_html, raw_text))
+    return lines
+
+
+def analyze_fragment(html: str) -> dict:
+    """
+    Analyze one top-level block of editor HTML (usually a single <p>) on its
+    own, for live analysis while typing. combine_fragments() turns the
+    fragments of a document back into the totals analyze_html would give.
+    Returns:
+      {"lines": [...], "counts": [word_count, char_count, sentence_count,
+       line_count, paragraph_count, syllable_count],
+       "blank": bool, "starts_open": bool, "ends_open": bool}
+    """
+    with timing.stage("html.parse"):
+        soup = BeautifulSoup(html, "html.parser")
     plain_text = soup.get_text(separator="\n")
 
-    # Word & char counts
-    words = plain_text.split()
-    word_count = len(words)
-    clean_text = plain_text.replace("\n", "").replace("\t", "")
-    char_count = len(clean_text)
+    paragraphs = soup.find_all("p")
+    lines = _paragraph_lines(paragraphs)
+
+    # Whether the text starts/ends mid-sentence, so sentences spanning
+    # fragments can be counted once
+    segments = SENTENCE_SPLIT_RE.split(plain_text.strip())
+    return {
+        "lines": lines,
+        "counts": list(_document_counts(plain_text, paragraph_count=len(paragraphs))),
+        "blank": not plain_text.strip(),
+        "starts_open": bool(segments[0].strip()),
+        "ends_open": bool(segments[-1].strip()),
+    }
 
-    # Sentence count
-    sentences = re.split(r"[.!?]+(?:\s|$)", plain_text.strip())
-    sentence_count = len([s for s in sentences if s.strip()])
 
-    # Line count (based on newlines in plain text)
-    line_count = len([line for line in plain_text.splitlines() if line.strip()])
+def combine_fragments(fragments) -> tuple[int, int, int, int, int, int]:
+    """
+    Document totals from analyze_fragment() results in document order.
+    Returns:
+      (word_count, char_count, sentence_count, line_count, paragraph_count, syllable_count)
+    """
+    totals = [0] * 6
+    sentence_open = False
+    for fragment in fragments:
+        totals = [a + b for a, b in zip(totals, fragment["counts"])]
+        if fragment["blank"]:
+            continue
+        # A sentence left open by the previous text continues here
+        if sentence_open and fragment["starts_open"]:
+            totals[2] -= 1
+        sentence_open = fragment["ends_open"]
+    return tuple(totals)
 
-    # Paragraph count (<p> tags)
-    paragraph_count = len(soup.find_all("p"))
 
-    # Syllable count
-    syllable_count = sum(count_syllables_in_word(w) for w in words)
+def process_docx(file_path: str) -> tuple[str, int, int, int, int, int, int]:
+    """
+    Read DOCX, convert to HTML preserving:
+    - Paragraph alignment
+    - Inline styles (bold, italic, underline)
+    - Multiple spaces/tabs
+    - Blank lines (as <br> or empty <p>)
+    Returns:
+      (html_content, word_count, char_count, sentence_count, line_count, paragraph_count, syllable_count)
+    """
+    return analyze_docx(file_path)[0]
+
+
+def process_html(html: str) -> tuple[str, int, int, int, int, int, int]:
+    """
+    Analyze already-formatted HTML (from CKEditor).
+    Returns:
+      (html_content, word_count, char_count, sentence_count,
+       line_count, paragraph_count, syllable_count)
+    """
+    return analyze_html(html)[0]
 
-    return (
-        html_content,
-        word_count,
-        char_count,
-        sentence_count,
-        line_count,
-        paragraph_count,
-        syllable_count,
-    )
 
 def process_docx_perline(file_path: str) -> list[dict]:
     """
     Analyze the DOCX line by line, returning a list of dicts:
     [
-      {"text": "<b>Hello</b> world", "words": 2, "syllables": 3},
+      {"text": "<b>Hello</b> world", "words": 2, "syllables": 3,
+       "stress": "01M", "meter": "irregular", "rhyme": "ER L D"},
       ...
     ]
 
@@ -187,51 +400,8 @@ def process_docx_perline(file_path: str) -> list[dict]:
     - Preserves leading spaces/tabs
     - Counts words/syllables from raw text (ignores tags)
     """
-    doc = Document(file_path)
-
-    line_stats = []
-    for para in doc.paragraphs:
-        if not para.text.strip():
-            line_stats.append({"text": "&nbsp;", "words": -1, "syllables": -1})
-            continue
-
-        # Build inner HTML for the paragraph (like in process_docx)
-        html_runs = []
-        for run in para.runs:
-            text = run.text.replace("\n", "<br>")
-            text = text.replace("  ", "&nbsp;&nbsp;")
-            text = text.replace("\t", "&nbsp;&nbsp;&nbsp;&nbsp;")
-
-            if not text:
-                continue
-            if run.bold:
-                text = f"<b>{text}</b>"
-            if run.italic:
-                text = f"<i>{text}</i>"
-            if run.underline:
-                text = f"<u>{text}</u>"
+    return analyze_docx(file_path)[1]
 
-            html_runs.append(text)
-
-        raw_html = "".join(html_runs).strip()
-        raw_text = para.text.strip()
-
-        if raw_text == "":
-            line_stats.append({"text": "&nbsp;", "words": -1, "syllables": -1})
-            continue
-
-        words = re.findall(r"\b\w+\b", raw_text)
-        syllables = sum(count_syllables_in_word(w) for w in words)
-
-        line_stats.append(
-            {
-                "text": raw_html,     # preserves inline formatting
-                "words": len(words),
-                "syllables": syllables,
-            }
-        )
-
-    return line_stats
 
 def process_html_perline(html_content: str) -> list[dict]:
     """
@@ -239,31 +409,8 @@ def process_html_perline(html_content: str) -> list[dict]:
     Preserves <b>, <i>, <u>, etc.
     Blank lines get a &nbsp; placeholder.
     Counts words/syllables from the raw *text* (ignores tags).
+    Only the lines: no document HTML or totals.
     """
-    soup = BeautifulSoup(html_content, "html.parser")
-
-    line_stats = []
-    for p in soup.find_all("p"):
-        # Get the inner HTML of the <p> instead of plain text
-        raw_html = "".join(str(c) for c in p.contents).strip()
-        raw_text = p.get_text().strip()
-
-        if raw_text == "":
-            # Preserve blank lines visually with &nbsp;
-            line_stats.append({"text": "&nbsp;", "words": -1, "syllables": -1})
-            continue
-
-        # Count words and syllables from raw *text* (not HTML)
-        words = re.findall(r"\b\w+\b", raw_text)
-        syllables = sum(count_syllables_in_word(w) for w in words)
-
-        line_stats.append(
-            {
-                "text": raw_html,      # preserves <b>, <i>, <u>, etc.
-                "words": len(words),
-                "syllables": syllables,
-            }
-        )
-
-    return line_stats
-
+    with timing.stage("html.parse"):
+        soup = BeautifulSoup(html_content, "html.parser")
+    return _paragraph_lines(soup.find_all("p"))
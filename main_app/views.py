@@ -1,13 +1,33 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.shortcuts import aget_object_or_404, render, redirect, get_object_or_404
 from django.contrib import messages
-from .forms import DocumentForm
-from .models import Document
-from .utils import (
-    process_docx,
-    process_docx_perline,
-    process_html,
-    process_html_perline,
+from django.core.cache import caches
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, urlencode
+from django.views.decorators.http import require_GET, require_POST
+import hashlib
+import hmac
+import json
+from django.http import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseForbidden,
+    JsonResponse,
+    StreamingHttpResponse,
 )
+from django.urls import reverse
+from .forms import DocumentForm
+from .heatmap import corpus_heatmap, pack_line_metrics, piece_heatmap
+from .jobs import enqueue_analysis, queue_enabled
+from .listing import DEFAULT_SORT, PARAMS as LISTING_PARAMS, SORTS, listing_query
+from .models import AuthorStats, CorpusStats, Document, RhymeEntry
+from . import executor, export, timing
+from .streaming import is_asgi, stream_for
+from .pagination import MAX_PAGE_SIZE, akeyset_page, keyset_page, page_size_from
+from .search import search
+from .utils import analyze_fragment, combine_fragments
 
 
 # Home view
@@ -15,14 +35,142 @@ def home(request):
     return render(request, "home.html")
 
 
-# List all "pieces"
-def pieces_index(request):
-    pieces = Document.objects.all().order_by("-created_at")
-    return render(request, "pieces/index.html", {"pieces": pieces})
+# render() for async views (templates may touch the session and messages)
+arender = sync_to_async(render)
+
+
+# Columns shown in the pieces listing (never the formatted_text blob); they
+# include every sortable metric, which keyset pagination reads back
+INDEX_FIELDS = (
+    "id", "title", "author", "slug", "word_count", "char_count", "created_at",
+    "line_count", "syllable_count", "syllables_per_line", "syllables_per_word",
+    "flesch_reading_ease",
+)
+
+
+def _listing_params(request):
+    """(filters, order_by, query string of the listing parameters); raises ValueError."""
+    filters, order_by = listing_query(request.GET)
+    kept = {name: request.GET[name] for name in LISTING_PARAMS if request.GET.get(name)}
+    return filters, order_by, urlencode(kept)
+
+
+# List all "pieces", one keyset page at a time, filtered and sorted by ?sort= etc.
+async def pieces_index(request):
+    page_size = page_size_from(request.GET.get("limit"))
+    try:
+        filters, order_by, listing = _listing_params(request)
+        pieces, next_cursor = await akeyset_page(
+            Document.objects.only(*INDEX_FIELDS).filter(**filters),
+            request.GET.get("after"),
+            page_size,
+            order_by,
+        )
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+
+    return await arender(request, "pieces/index.html", {
+        "pieces": pieces,
+        "next_cursor": next_cursor,
+        "is_first_page": not request.GET.get("after"),
+        "listing": listing,
+        "sort": request.GET.get("sort") or DEFAULT_SORT,
+        "sorts": SORTS,
+        "params": request.GET,
+    })
+
+
+# Corpus and per-author totals, read from the precomputed aggregate rows only
+def stats_dashboard(request):
+    return render(request, "stats/corpus.html", {
+        "corpus": CorpusStats.current(),
+        "authors": AuthorStats.objects.order_by("-word_count", "author"),
+    })
+
+
+def author_stats(request, author):
+    return render(request, "stats/author.html", {
+        "stats": get_object_or_404(AuthorStats, author=author),
+        "corpus": CorpusStats.current(),
+    })
+
+
+# Same listing as JSON
+def pieces_index_json(request):
+    page_size = page_size_from(request.GET.get("limit"))
+    try:
+        filters, order_by, listing = _listing_params(request)
+        rows, next_cursor = keyset_page(
+            Document.objects.values(*INDEX_FIELDS).filter(**filters),
+            request.GET.get("after"),
+            page_size,
+            order_by,
+        )
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    results = [
+        {
+            **row,
+            "created_at": row["created_at"].isoformat(),
+            "url": reverse("document_detail", kwargs={"slug": row["slug"]}),
+        }
+        for row in rows
+    ]
+    next_url = None
+    if next_cursor:
+        next_url = f"{reverse('pieces_index_json')}?after={next_cursor}&limit={page_size}"
+        if listing:
+            next_url += f"&{listing}"
+    return JsonResponse({"results": results, "next": next_url})
+
+
+def _page_number(value) -> int:
+    try:
+        return max(1, int(value))
+    except (TypeError, ValueError):
+        return 1
+
+
+# Ranked full-text search over title, author and text
+def search_pieces(request):
+    query = request.GET.get("q", "").strip()
+    page = _page_number(request.GET.get("page"))
+    results, has_next = search(query, page, fields=INDEX_FIELDS) if query else ([], False)
+    return render(request, "pieces/search.html", {
+        "query": query,
+        "results": results,
+        "page": page,
+        "has_next": has_next,
+    })
+
+
+# Same search as JSON
+def search_pieces_json(request):
+    query = request.GET.get("q", "").strip()
+    page = _page_number(request.GET.get("page"))
+    results, has_next = search(query, page, fields=INDEX_FIELDS) if query else ([], False)
+    return JsonResponse({
+        "query": query,
+        "page": page,
+        "has_next": has_next,
+        "results": [
+            {
+                "title": doc.title,
+                "author": doc.author,
+                "slug": doc.slug,
+                "word_count": doc.word_count,
+                "char_count": doc.char_count,
+                "created_at": doc.created_at.isoformat(),
+                "url": reverse("document_detail", kwargs={"slug": doc.slug}),
+            }
+            for doc in results
+        ],
+    })
 
 
 # Upload a new document (file OR HTML paste)
-def uploader(request):
+async def uploader(request):
     if request.method == "POST":
         form = DocumentForm(request.POST, request.FILES)
         if form.is_valid():
@@ -30,108 +178,468 @@ def uploader(request):
 
             # Generate slug and check duplicates
             slug = doc.generate_slug()
-            if Document.objects.filter(slug=slug).exists():
+            if await Document.objects.filter(slug=slug).aexists():
                 messages.error(
                     request,
                     "A piece with this Title + Author already exists. Please choose a different title.",
                 )
-                return render(request, "uploader.html", {"form": form})
+                return await arender(request, "uploader.html", {"form": form})
 
             doc.slug = slug
-            doc.save()  # Save so file exists on disk
-
-            # --- File upload path ---
-            if doc.uploaded_file:
-                try:
-                    (
-                        html_content,
-                        word_count,
-                        char_count,
-                        sentence_count,
-                        line_count,
-                        paragraph_count,
-                        syllable_count,
-                    ) = process_docx(doc.uploaded_file.path)
-
-                    doc.formatted_text = html_content
-                    doc.word_count = word_count
-                    doc.char_count = char_count
-                    doc.sentence_count = sentence_count
-                    doc.line_count = line_count
-                    doc.paragraph_count = paragraph_count
-                    doc.syllable_count = syllable_count
-
-                except Exception as e:
-                    messages.error(request, f"Could not process file: {e}")
-                    return render(request, "uploader.html", {"form": form})
-
-            # --- HTML paste path ---
-            elif doc.formatted_text:
-                try:
-                    (
-                        html_content,
-                        word_count,
-                        char_count,
-                        sentence_count,
-                        line_count,
-                        paragraph_count,
-                        syllable_count,
-                    ) = process_html(doc.formatted_text)
-
-                    doc.formatted_text = html_content
-                    doc.word_count = word_count
-                    doc.char_count = char_count
-                    doc.sentence_count = sentence_count
-                    doc.line_count = line_count
-                    doc.paragraph_count = paragraph_count
-                    doc.syllable_count = syllable_count
-
-                except Exception as e:
-                    messages.error(request, f"Could not process HTML: {e}")
-                    return render(request, "uploader.html", {"form": form})
-
-            doc.save()
+            has_source = bool(doc.uploaded_file or doc.formatted_text)
+
+            # Hand the analysis to the background worker
+            if queue_enabled() and has_source:
+                with timing.stage("upload.save"):
+                    await doc.asave()  # Save so file exists on disk
+                await sync_to_async(enqueue_analysis)(doc)
+                return redirect("document_detail", slug=doc.slug)
+
+            # Analyze in the request, on the analysis executor (503 while it's full)
+            try:
+                with executor.slot():
+                    with timing.stage("upload.save"):
+                        await doc.asave()  # Save so file exists on disk
+
+                    # --- File upload path / HTML paste path ---
+                    if has_source:
+                        try:
+                            with timing.stage("upload.analyze"):
+                                await doc.aanalyze()
+                        except Exception as e:
+                            source = "file" if doc.uploaded_file else "HTML"
+                            messages.error(request, f"Could not process {source}: {e}")
+                            return await arender(request, "uploader.html", {"form": form})
+            except executor.Saturated:
+                messages.error(
+                    request, "The server is busy analyzing other uploads. Please try again shortly."
+                )
+                response = await arender(request, "uploader.html", {"form": form}, status=503)
+                response["Retry-After"] = str(executor.retry_after())
+                return response
+
+            with timing.stage("upload.save"):
+                await doc.asave()
             return redirect("document_detail", slug=doc.slug)
     else:
         form = DocumentForm()
 
-    return render(request, "uploader.html", {"form": form})
+    return await arender(request, "uploader.html", {"form": form})
 
 
-# Detail view with per-line analysis
-def document_detail(request, slug):
-    document = get_object_or_404(Document, slug=slug)
+# --- Live analysis while typing in the uploader ---
+
+LIVE_SESSION_KEY = "live_analysis"
+LIVE_CACHE_PREFIX = "live"
+COUNT_NAMES = (
+    "word_count", "char_count", "sentence_count", "line_count", "paragraph_count", "syllable_count",
+)
+
+
+def _live_request(request):
+    """(order, paragraphs) from the request body; raises ValueError when malformed."""
+    try:
+        data = json.loads(request.body)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Body must be JSON.") from e
+
+    order = data.get("order") if isinstance(data, dict) else None
+    paragraphs = data.get("paragraphs", {}) if isinstance(data, dict) else None
+    if not isinstance(order, list) or not all(isinstance(key, str) for key in order):
+        raise ValueError('"order" must be a list of paragraph keys.')
+    if not isinstance(paragraphs, dict) or not all(isinstance(v, str) for v in paragraphs.values()):
+        raise ValueError('"paragraphs" must map paragraph keys to HTML.')
+
+    max_paragraphs = getattr(settings, "LIVE_ANALYSIS_MAX_PARAGRAPHS", 5000)
+    if len(order) > max_paragraphs or len(paragraphs) > max_paragraphs:
+        raise ValueError(f"At most {max_paragraphs} paragraphs.")
+    return order, paragraphs
+
+
+def _live_cache_key(session_key, key):
+    return f"{LIVE_CACHE_PREFIX}:{session_key}:{hashlib.sha256(key.encode()).hexdigest()[:32]}"
 
-    line_stats = []
-    scanned_text = None
-
-    if document.uploaded_file:
-        try:
-            line_stats = process_docx_perline(document.uploaded_file.path)
-        except Exception as e:
-            line_stats = [{"text": f"Error: {e}", "words": 0, "syllables": 0}]
-    elif document.formatted_text:
-        try:
-            line_stats = process_html_perline(document.formatted_text)
-        except Exception as e:
-            line_stats = [{"text": f"Error: {e}", "words": 0, "syllables": 0}]
-
-    # Placeholder scansion (later we replace with real stress markers)
-    if document.formatted_text:
-        scanned_text = document.formatted_text.replace(
-            "<p", "<p class='scanned'"  # simple marker
+
+# Counts for the text being typed into the uploader. The client sends the
+# document's paragraph keys in order plus the HTML of paragraphs the server
+# hasn't seen; only those are analyzed. Each paragraph's counts are cached
+# per (session, key), so a request only touches the session's key list.
+@require_POST
+def live_analysis_json(request):
+    try:
+        order, paragraphs = _live_request(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    if request.session.session_key is None:
+        request.session.create()
+    session_key = request.session.session_key
+    cache = caches["live_analysis"]
+
+    keys = {key: _live_cache_key(session_key, key) for key in dict.fromkeys([*order, *paragraphs])}
+    stored = cache.get_many(list(keys.values()))
+    cached = {key: stored[cache_key] for key, cache_key in keys.items() if cache_key in stored}
+
+    analyzed = {key: analyze_fragment(html) for key, html in paragraphs.items() if key not in cached}
+    # The line records go back to the client once; the cache keeps what totals need
+    summaries = {key: {k: v for k, v in result.items() if k != "lines"} for key, result in analyzed.items()}
+    if summaries:
+        cache.set_many(
+            {keys[key]: summary for key, summary in summaries.items()},
+            timeout=getattr(settings, "LIVE_ANALYSIS_CACHE_TIMEOUT", 3600),
         )
+    cached.update(summaries)
+
+    # Keys the cache lost (expired or never sent): the client resends their HTML
+    missing = [key for key in dict.fromkeys(order) if key not in cached]
+
+    if request.session.get(LIVE_SESSION_KEY) != order:
+        request.session[LIVE_SESSION_KEY] = order
+
+    data = {
+        "lines": {key: result["lines"] for key, result in analyzed.items()},
+        "missing": missing,
+    }
+    if not missing:
+        data["totals"] = dict(zip(COUNT_NAMES, combine_fragments(cached[key] for key in order)))
+    return JsonResponse(data)
+
+
+def render_detail_body(document):
+    """The piece text and per-line stats columns, as cached in the fragment cache."""
+    # The body is built from the line stats; formatted_text is only loaded to rebuild them
+    document.refresh_from_db(fields=["line_stats"])
+
+    # Per-line stats are stored at upload; only rebuild them when missing
+    line_stats = document.line_stats
+    if document.status != Document.STATUS_DONE:
+        line_stats = []
+    elif line_stats is None:
+        line_stats = []
+        if document.uploaded_file or document.formatted_text:
+            try:
+                document.refresh_line_stats()
+                document.save(update_fields=["line_stats", "line_metrics", "minhash", "meter", "rhyme_scheme"])
+                line_stats = document.line_stats
+            except Exception as e:
+                line_stats = [{"text": f"Error: {e}", "words": 0, "syllables": 0}]
+
+    # Scansion marks and meters come from the stress codes stored per line
+    return render_to_string("pieces/_detail_body.html", {
+        "line_stats": line_stats,
+    })
+
+
+# Detail view with per-line analysis
+async def document_detail(request, slug):
+    # Text and line stats are only loaded when the rendered body isn't cached
+    document = await aget_object_or_404(
+        Document.objects.defer("formatted_text", "line_stats"), slug=slug
+    )
+
+    # Revalidation: 304 while the document hasn't changed
+    not_modified = get_conditional_response(
+        request,
+        etag=document.etag,
+        last_modified=int(document.updated_at.timestamp()),
+    )
+    if not_modified is not None:
+        return not_modified
+
+    fragments = caches["fragments"]
+    with timing.stage("detail.cache"):
+        body = await fragments.aget(document.fragment_key("detail_body"))
+    if body is None:
+        with timing.stage("detail.render_body"):
+            body = await sync_to_async(render_detail_body)(document)
+        await fragments.aset(document.fragment_key("detail_body"), body, timeout=None)
 
     # Define available tools for the toolbar
     tools = [
         {"label": "Toggle Scansion", "js_function": "toggleScansion", "disabled": False},
-        {"label": "Meter (soon)", "js_function": "toggleMeter", "disabled": True},
-        {"label": "Heatmap (soon)", "js_function": "toggleHeatmap", "disabled": True},
+        {"label": "Meter", "js_function": "toggleMeter", "disabled": False},
+        {"label": "Heatmap", "js_function": "toggleHeatmap", "disabled": False},
     ]
 
-    return render(request, "pieces/detail.html", {
+    # The earlier piece this one was flagged as a probable revision of
+    near_duplicate = None
+    if document.near_duplicate_of_id:
+        near_duplicate = await Document.objects.only("title", "author", "slug").filter(
+            pk=document.near_duplicate_of_id
+        ).afirst()
+
+    response = await arender(request, "pieces/detail.html", {
         "document": document,
-        "line_stats": line_stats,
-        "scanned_text": scanned_text,
+        "body": body,
         "tools": tools,
-    })
\ No newline at end of file
+        "near_duplicate": near_duplicate,
+    })
+    response["ETag"] = document.etag
+    response["Last-Modified"] = http_date(document.updated_at.timestamp())
+    patch_cache_control(response, no_cache=True)
+    return response
+
+# Analysis progress, polled by the detail page while a job is queued
+def document_status(request, slug):
+    document = get_object_or_404(Document, slug=slug)
+    data = {
+        "slug": document.slug,
+        "status": document.status,
+        "error": document.analysis_error,
+    }
+    if document.status == Document.STATUS_DONE:
+        data.update(
+            word_count=document.word_count,
+            char_count=document.char_count,
+            sentence_count=document.sentence_count,
+            line_count=document.line_count,
+            paragraph_count=document.paragraph_count,
+            syllable_count=document.syllable_count,
+        )
+    return JsonResponse(data)
+
+
+# --- JSON analysis API ---
+
+# Document fields the analysis API reads (never formatted_text)
+ANALYSIS_FIELDS = (
+    "id", "title", "author", "slug", "status", "created_at", "updated_at", "line_stats",
+    "meter", "rhyme_scheme",
+    "word_count", "char_count", "sentence_count", "line_count", "paragraph_count", "syllable_count",
+)
+BATCH_MAX_SLUGS = 100
+
+
+def _analysis_head(document) -> dict:
+    return {
+        "slug": document.slug,
+        "title": document.title,
+        "author": document.author,
+        "status": document.status,
+        "updated_at": document.updated_at.isoformat(),
+        "meter": document.meter,
+        "rhyme_scheme": document.rhyme_scheme,
+        "totals": {
+            "word_count": document.word_count,
+            "char_count": document.char_count,
+            "sentence_count": document.sentence_count,
+            "line_count": document.line_count,
+            "paragraph_count": document.paragraph_count,
+            "syllable_count": document.syllable_count,
+        },
+    }
+
+
+def _stream_analysis(document):
+    """Encode one document's analysis piece by piece, one line record at a time."""
+    head = json.dumps(_analysis_head(document))
+    yield head[:-1] + ', "lines": ['
+    for i, line in enumerate(document.line_stats or []):
+        yield ("," if i else "") + json.dumps(line)
+    yield "]}"
+
+
+def _not_modified_or_stream(request, etag, chunks):
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+    # Sent as they're encoded under either handler (see streaming.py)
+    response = StreamingHttpResponse(stream_for(request, chunks), content_type="application/json")
+    response["ETag"] = etag
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+# Totals and per-line stats for one piece
+@require_GET
+def document_analysis_json(request, slug):
+    document = get_object_or_404(Document.objects.only(*ANALYSIS_FIELDS), slug=slug)
+    return _not_modified_or_stream(request, document.etag, _stream_analysis(document))
+
+
+# Totals and per-line stats for many pieces: ?slug=a&slug=b (one query)
+@require_GET
+def document_analysis_batch_json(request):
+    slugs = list(dict.fromkeys(request.GET.getlist("slug")))
+    if not slugs:
+        return JsonResponse({"error": "Pass one or more ?slug= parameters."}, status=400)
+    if len(slugs) > BATCH_MAX_SLUGS:
+        return JsonResponse({"error": f"At most {BATCH_MAX_SLUGS} slugs per request."}, status=400)
+
+    found = {
+        doc.slug: doc
+        for doc in Document.objects.only(*ANALYSIS_FIELDS).filter(slug__in=slugs)
+    }
+    missing = [slug for slug in slugs if slug not in found]
+
+    # The batch changes when any member (or the set of missing slugs) does
+    versions = "|".join(found[slug].etag if slug in found else f"missing:{slug}" for slug in slugs)
+    etag = f'"batch-{hashlib.sha256(versions.encode()).hexdigest()[:32]}"'
+
+    def chunks():
+        yield '{"results": {'
+        for i, slug in enumerate(slug for slug in slugs if slug in found):
+            yield ("," if i else "") + json.dumps(slug) + ": "
+            yield from _stream_analysis(found[slug])
+        yield '}, "missing": ' + json.dumps(missing) + "}"
+
+    return _not_modified_or_stream(request, etag, chunks())
+
+
+# Counts of every analyzed piece (or ?shape=lines: every line) as ?format=csv|jsonl,
+# narrowed by ?author= (repeatable), ?since= and ?until= (ISO dates, inclusive)
+@require_GET
+def export_stats(request):
+    fmt = request.GET.get("format") or "csv"
+    shape = request.GET.get("shape") or "pieces"
+    if fmt not in export.FORMATS:
+        return JsonResponse(
+            {"error": f"Unknown format {fmt!r}; use one of {', '.join(export.FORMATS)}."}, status=400
+        )
+    if shape not in export.SHAPES:
+        return JsonResponse(
+            {"error": f"Unknown shape {shape!r}; use one of {', '.join(export.SHAPES)}."}, status=400
+        )
+    try:
+        queryset = export.export_queryset(
+            request.GET.getlist("author"), request.GET.get("since"), request.GET.get("until")
+        )
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    # Rows are streamed under either handler, so memory stays flat (see export.py)
+    rows = export.aexport(queryset, shape, fmt) if is_asgi(request) else export.export(queryset, shape, fmt)
+    response = StreamingHttpResponse(rows, content_type=export.FORMATS[fmt])
+    response["Content-Disposition"] = f'attachment; filename="penm8-{shape}.{fmt}"'
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+# --- Rhymes ---
+
+# Lines across the corpus that rhyme with ?q= (a word or a whole line),
+# paged in index order with ?after=<cursor>&limit=N
+@require_GET
+def rhymes_json(request):
+    query = request.GET.get("q", "").strip()
+    if not query:
+        return JsonResponse({"error": "Pass a word or line as ?q=."}, status=400)
+    page_size = page_size_from(request.GET.get("limit"))
+    try:
+        after = int(request.GET.get("after") or 0)
+    except ValueError:
+        return JsonResponse({"error": "Invalid cursor."}, status=400)
+
+    key, entries = RhymeEntry.rhymes_with(query)
+    rows = list(
+        entries.filter(id__gt=after)
+        .select_related("document")
+        .only("line", "word", "text", "document__slug", "document__title", "document__author")
+        [: page_size + 1]
+    )
+    next_url = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        params = urlencode({"q": query, "after": rows[-1].pk, "limit": page_size})
+        next_url = f"{reverse('rhymes_json')}?{params}"
+
+    return JsonResponse({
+        "query": query,
+        "rhyme_key": key,
+        "results": [
+            {
+                "slug": entry.document.slug,
+                "title": entry.document.title,
+                "author": entry.document.author,
+                "line": entry.line,
+                "word": entry.word,
+                "text": entry.text,
+                "url": reverse("document_detail", kwargs={"slug": entry.document.slug}),
+            }
+            for entry in rows
+        ],
+        "next": next_url,
+    })
+
+
+# --- Heatmaps ---
+
+HEATMAP_DEFAULT_WINDOW = 4
+HEATMAP_MAX_WINDOW = 50
+
+
+def _window_from(value) -> int:
+    try:
+        return max(1, min(HEATMAP_MAX_WINDOW, int(value)))
+    except (TypeError, ValueError):
+        return HEATMAP_DEFAULT_WINDOW
+
+
+# Per-line syllables, stress density and rolling means for one piece
+@require_GET
+def piece_heatmap_json(request, slug):
+    document = get_object_or_404(
+        Document.objects.only("id", "slug", "status", "updated_at", "line_metrics"), slug=slug
+    )
+    window = _window_from(request.GET.get("window"))
+    etag = f'"{document.pk}-{document.cache_version}-heatmap-{window}"'
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    # Rows analyzed before line_metrics existed: pack them once from line_stats
+    if document.line_metrics is None and document.status == Document.STATUS_DONE:
+        document.refresh_from_db(fields=["line_stats"])
+        if document.line_stats is not None:
+            document.line_metrics = pack_line_metrics(document.line_stats)
+            Document.objects.filter(pk=document.pk).update(line_metrics=document.line_metrics)
+
+    data = {"slug": document.slug, "window": window, **piece_heatmap(document.line_metrics, window)}
+    response = JsonResponse(data)
+    response["ETag"] = etag
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+# Pieces compared side by side: ?author=A (repeatable); all analyzed pieces without one.
+# Keyset-paged like the listing (?after=&limit=, up to MAX_PAGE_SIZE pieces per page);
+# z-scores compare pieces by the same author within the page.
+@require_GET
+def corpus_heatmap_json(request):
+    page_size = page_size_from(request.GET.get("limit"), default=MAX_PAGE_SIZE)
+    rows = Document.objects.filter(status=Document.STATUS_DONE, line_metrics__isnull=False)
+    authors = request.GET.getlist("author")
+    if authors:
+        rows = rows.filter(author__in=authors)
+    try:
+        rows, next_cursor = keyset_page(
+            rows.values("id", "created_at", "slug", "title", "author", "line_metrics"),
+            request.GET.get("after"),
+            page_size,
+        )
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    next_url = None
+    if next_cursor:
+        params = urlencode({"author": authors, "after": next_cursor, "limit": page_size}, doseq=True)
+        next_url = f"{reverse('corpus_heatmap_json')}?{params}"
+    data = corpus_heatmap([
+        (row["slug"], row["title"], row["author"], row["line_metrics"]) for row in rows
+    ])
+    return JsonResponse({**data, "next": next_url})
+
+
+def _metrics_allowed(request):
+    token = getattr(settings, "METRICS_TOKEN", "")
+    scheme, _, given = request.headers.get("Authorization", "").partition(" ")
+    if token and scheme.lower() == "bearer" and hmac.compare_digest(given.encode(), token.encode()):
+        return True
+    return request.user.is_active and request.user.is_staff
+
+
+# In-process stage histograms and counters (Prometheus text), for scrapers with the token and staff
+def metrics(request):
+    if not _metrics_allowed(request):
+        return HttpResponseForbidden("Metrics need the metrics token or a staff login.")
+    return HttpResponse(timing.render_metrics(), content_type="text/plain; version=0.0.4")
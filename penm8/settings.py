@@ -43,6 +43,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'main_app.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -148,6 +149,87 @@ CKEDITOR_CONFIGS = {
     }
 }
 
+# Caches
+# "fragments" holds rendered piece pages under per-document version keys.
+# PENM8_FRAGMENT_CACHE=file keeps them on disk (shared by all workers on a host).
+FRAGMENT_CACHE_MAX_ENTRIES = 2000
+
+if os.environ.get("PENM8_FRAGMENT_CACHE") == "file":
+    FRAGMENT_CACHE = {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / "cache" / "fragments",
+    }
+else:
+    FRAGMENT_CACHE = {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "penm8-fragments",
+    }
+FRAGMENT_CACHE["TIMEOUT"] = None  # keys are versioned, eviction is by size
+FRAGMENT_CACHE["OPTIONS"] = {"MAX_ENTRIES": FRAGMENT_CACHE_MAX_ENTRIES}
+
+# "live_analysis" holds per-paragraph counts for the uploader's live analysis,
+# keyed by session (small entries, many of them). A session's requests land on
+# any worker process, so every worker must see the same entries: never use a
+# per-process LocMem cache here with more than one worker. The database by
+# default (run `manage.py createcachetable` once), or Redis with
+# PENM8_LIVE_ANALYSIS_REDIS=redis://host:6379/1.
+if os.environ.get("PENM8_LIVE_ANALYSIS_REDIS"):
+    LIVE_ANALYSIS_CACHE = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ["PENM8_LIVE_ANALYSIS_REDIS"],
+    }
+else:
+    LIVE_ANALYSIS_CACHE = {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "penm8_live_analysis",
+        "OPTIONS": {"MAX_ENTRIES": 200_000},
+    }
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "fragments": FRAGMENT_CACHE,
+    "live_analysis": LIVE_ANALYSIS_CACHE,
+}
+
+# Background analysis queue (run workers with `manage.py analysis_worker`).
+# With the queue disabled, uploads are analyzed inside the request.
+ANALYSIS_QUEUE_ENABLED = True
+ANALYSIS_WORKER_CONCURRENCY = 2
+ANALYSIS_JOB_MAX_ATTEMPTS = 3
+ANALYSIS_JOB_LEASE_SECONDS = 600
+
+# Pool for analysis run inside async views: "thread", "process" or "inline".
+# Uploads beyond WORKERS + QUEUE in flight get a 503 with Retry-After.
+ANALYSIS_EXECUTOR = os.environ.get("PENM8_ANALYSIS_EXECUTOR", "thread")
+ANALYSIS_EXECUTOR_WORKERS = 2
+ANALYSIS_EXECUTOR_QUEUE = 8
+ANALYSIS_EXECUTOR_RETRY_AFTER = 5
+
+# Analysis results reused for identical uploads (LRU-evicted past this size,
+# checked every ANALYSIS_CACHE_EVICT_EVERY stores)
+ANALYSIS_CACHE_MAX_ENTRIES = 5000
+ANALYSIS_CACHE_EVICT_EVERY = 50
+# Seconds cache hit/miss counts are held in memory before being written during
+# long runs (imports, workers); requests write theirs as they finish
+CACHE_COUNTER_FLUSH_SECONDS = 10
+
+# Per-stage timings: Server-Timing headers and the metrics/ endpoint
+TIMING_ENABLED = os.environ.get("PENM8_TIMING") == "1"
+# Scrapers read metrics/ with "Authorization: Bearer <token>"; without a
+# token only logged-in staff can (client addresses are the proxy's)
+METRICS_TOKEN = os.environ.get("PENM8_METRICS_TOKEN", "")
+
+# Paragraphs a live-analysis session may hold (uploader counts while typing)
+LIVE_ANALYSIS_MAX_PARAGRAPHS = 5000
+# Seconds an analyzed paragraph stays in the live_analysis cache for its session
+LIVE_ANALYSIS_CACHE_TIMEOUT = 3600
+
+# Uploads at least this similar (estimated Jaccard of word shingles) to an
+# earlier piece are flagged as probable revisions of it
+NEAR_DUPLICATE_THRESHOLD = 0.8
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 